@@ -1,3 +1,8 @@
+import multiprocessing
+
 from dread_editor import main_loop
 
-main_loop.main_loop()
+if __name__ == "__main__":
+    # The actor search and index use process pools, which re-run this module in each worker when frozen
+    multiprocessing.freeze_support()
+    main_loop.main_loop()
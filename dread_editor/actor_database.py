@@ -0,0 +1,356 @@
+import concurrent.futures
+import hashlib
+import logging
+import sqlite3
+import threading
+import typing
+from pathlib import Path
+from typing import Optional
+
+from mercury_engine_data_structures.file_tree_editor import Game
+
+from dread_editor import actor_search
+from dread_editor.actor_groups import actor_key_of_link
+from dread_editor.actor_search import ActorRecord
+from dread_editor.asset_catalogue import AssetCatalogue
+from dread_editor import preferences
+
+T = typing.TypeVar("T")
+
+# Bump whenever the tables change shape. Databases of other versions are rebuilt from scratch
+_DATABASE_VERSION = 2
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS levels (
+    level TEXT PRIMARY KEY,
+    digest TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS actors (
+    id INTEGER PRIMARY KEY,
+    level TEXT NOT NULL,
+    layer TEXT NOT NULL,
+    name TEXT NOT NULL,
+    type TEXT NOT NULL,
+    actordef TEXT NOT NULL,
+    x REAL,
+    y REAL,
+    z REAL
+);
+CREATE INDEX IF NOT EXISTS actors_by_level ON actors (level);
+CREATE INDEX IF NOT EXISTS actors_by_actordef ON actors (actordef);
+CREATE TABLE IF NOT EXISTS components (
+    actor INTEGER NOT NULL REFERENCES actors (id) ON DELETE CASCADE,
+    component TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS components_by_actor ON components (actor);
+CREATE INDEX IF NOT EXISTS components_by_name ON components (component);
+CREATE TABLE IF NOT EXISTS actor_groups (
+    level TEXT NOT NULL,
+    group_name TEXT NOT NULL,
+    layer TEXT NOT NULL,
+    actor TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS actor_groups_by_actor ON actor_groups (level, actor);
+CREATE TABLE IF NOT EXISTS actordefs (
+    actordef TEXT PRIMARY KEY,
+    bmsad TEXT
+);
+CREATE TABLE IF NOT EXISTS romfs (
+    fingerprint TEXT NOT NULL
+);
+"""
+
+_SELECT_RECORDS = """
+SELECT actors.level, actors.layer, actors.name, actors.type, actors.actordef,
+       group_concat(components.component, char(0)), actors.x, actors.y, actors.z
+FROM actors LEFT JOIN components ON components.actor = actors.id
+"""
+
+
+def database_path_for(root: Path) -> Path:
+    """Each RomFS root gets its own database, in the data directory."""
+    digest = hashlib.blake2b(str(root.absolute()).encode("utf-8"), digest_size=8).hexdigest()
+    return preferences.data_file_path(f"actor_index_{digest}.sqlite")
+
+
+def _connect(path: Path) -> sqlite3.Connection:
+    connection = sqlite3.connect(path)
+    connection.execute("PRAGMA foreign_keys = ON")
+    # Lets the main thread read while the indexer writes
+    connection.execute("PRAGMA journal_mode = WAL")
+    return connection
+
+
+def _record_of_row(row) -> ActorRecord:
+    level, layer, name, actor_type, actordef, components, x, y, z = row
+    return ActorRecord(
+        level, layer, name, actor_type, actordef,
+        tuple(components.split("\0")) if components else (),
+        (x, y, z) if x is not None else None,
+    )
+
+
+def resolve_bmsad(actordef: str, bmsad_names: set[str], bmsad_by_stem: dict[str, str]) -> Optional[str]:
+    """
+    The bmsad an actordef refers to. Dread uses `actordef:` links with the full path, while Samus Returns only has
+    the type of the actor, which is the name of its bmsad.
+    """
+    name = actordef.removeprefix("actordef:")
+    if name in bmsad_names:
+        return name
+    return bmsad_by_stem.get(name.rpartition("/")[2].removesuffix(".bmsad"))
+
+
+def _groups_of_level(game: Game, parsed, records: list[ActorRecord]) -> list[tuple[str, str, str]]:
+    """The group name, layer and actor name of every actor in a group of the given parsed level."""
+    if game == Game.SAMUS_RETURNS:
+        # Groups only have the actor names, which are unique in the whole level
+        layer_of = {record.name: record.layer for record in records}
+        return [
+            (group_name, layer_of.get(actor_name, ""), actor_name)
+            for group_name, group in parsed.all_actor_groups()
+            for actor_name in group.names
+        ]
+
+    return [
+        (group_name, *key)
+        for group_name in parsed.all_actor_groups()
+        for link in parsed.get_actor_group(group_name)
+        if (key := actor_key_of_link(link)) is not None
+    ]
+
+
+def index_level(level: str, game: Game, known_digest: Optional[str]):
+    """
+    Runs in a worker process. Returns the digest of the level's bytes, and its actors and groups if the digest
+    isn't the known one.
+    """
+    editor = actor_search.worker_editor()
+    digest = hashlib.blake2b(editor.get_raw_asset(level), digest_size=16).hexdigest()
+    if digest == known_digest:
+        return digest, None
+
+    parsed = editor.get_parsed_asset(level)
+    records = actor_search.records_of_level(level, game, parsed)
+    return digest, (records, _groups_of_level(game, parsed, records))
+
+
+class ActorDatabase:
+    """SQLite index of the actors of every level in a RomFS, refreshed in the background and kept between sessions."""
+    status: str = "Starting"
+    progress: float = 0.0
+    error: Optional[Exception] = None
+
+    # Increased whenever the indexer writes a level, so cached queries know they're outdated
+    generation: int = 0
+
+    def __init__(self, pool: concurrent.futures.ProcessPoolExecutor, root: Path, game: Game, level_files: list[str],
+                 catalogue: AssetCatalogue, fingerprint: str):
+        """
+        :param fingerprint: The `asset_cache.romfs_fingerprint` of the root. While it's the same as the last
+        refresh, only the levels that aren't in the index yet are read.
+        """
+        self.pool = pool
+        self.root = root
+        self.game = game
+        self.level_files = level_files
+        self.fingerprint = fingerprint
+        self.path = database_path_for(root)
+
+        bmsad_names = catalogue.with_extension(".bmsad")
+        self._bmsad_names = set(bmsad_names)
+        self._bmsad_by_stem = {name.rpartition("/")[2].removesuffix(".bmsad"): name for name in bmsad_names}
+
+        self._cache: dict[tuple, object] = {}
+        self._cache_generation = 0
+        self._error_taken = False
+        self._cancelled = threading.Event()
+        self._thread = threading.Thread(target=self._run, name=f"ActorDatabase-{root.name}", daemon=True)
+
+        # Without a usable database, the editor still works but every query is empty
+        self._connection: Optional[sqlite3.Connection] = None
+        try:
+            self._connection = _connect(self.path)
+            if self._connection.execute("PRAGMA user_version").fetchone()[0] != _DATABASE_VERSION:
+                self._connection.executescript("""
+                    DROP TABLE IF EXISTS components;
+                    DROP TABLE IF EXISTS actor_groups;
+                    DROP TABLE IF EXISTS actors;
+                    DROP TABLE IF EXISTS levels;
+                    DROP TABLE IF EXISTS actordefs;
+                    DROP TABLE IF EXISTS romfs;
+                """)
+                self._connection.execute(f"PRAGMA user_version = {_DATABASE_VERSION}")
+            self._connection.executescript(_SCHEMA)
+            self._connection.commit()
+        except sqlite3.Error as e:
+            logging.exception(f"Unable to open the actor index at {self.path}: {e}")
+            self.error = e
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+    def start(self):
+        if self._connection is not None:
+            self._thread.start()
+
+    def take_error(self) -> Optional[Exception]:
+        """The error that stopped the index, only returned once so it's only reported once."""
+        if self.error is None or self._error_taken:
+            return None
+        self._error_taken = True
+        return self.error
+
+    def cancel(self):
+        self._cancelled.set()
+
+    def is_indexing(self) -> bool:
+        return self._thread.is_alive()
+
+    def _run(self):
+        connection = _connect(self.path)
+        try:
+            known_digests = dict(connection.execute("SELECT level, digest FROM levels"))
+            known_fingerprints = {fingerprint for (fingerprint,) in connection.execute("SELECT fingerprint FROM romfs")}
+
+            removed = [(level,) for level in known_digests.keys() - set(self.level_files)]
+            with connection:
+                self._delete_levels(connection, removed)
+
+            # Without any change to the RomFS, the levels already in the index can't have changed either
+            if known_fingerprints == {self.fingerprint}:
+                levels = [level for level in self.level_files if level not in known_digests]
+            else:
+                levels = self.level_files
+
+            futures = {
+                self.pool.submit(index_level, level, self.game, known_digests.get(level)): level
+                for level in levels
+            }
+            for done, future in enumerate(concurrent.futures.as_completed(futures)):
+                if self._cancelled.is_set():
+                    for pending in futures:
+                        pending.cancel()
+                    return
+
+                level = futures[future]
+                self.status = f"Indexing {level}"
+                self.progress = done / len(futures)
+                try:
+                    digest, contents = future.result()
+                except concurrent.futures.BrokenExecutor:
+                    raise
+                except Exception as e:
+                    logging.exception(f"Unable to index {level}: {e}")
+                    continue
+
+                if contents is not None:
+                    with connection:
+                        self._write_level(connection, level, digest, *contents)
+                    self.generation += 1
+
+            with connection:
+                self._resolve_actordefs(connection)
+                connection.execute("DELETE FROM romfs")
+                connection.execute("INSERT INTO romfs (fingerprint) VALUES (?)", (self.fingerprint,))
+            self.generation += 1
+            self.status = "Done"
+            self.progress = 1.0
+
+        except Exception as e:
+            if not self._cancelled.is_set():
+                logging.exception(f"Unable to index the actors of {self.root}: {e}")
+                self.error = e
+
+        finally:
+            connection.close()
+
+    def _delete_levels(self, connection: sqlite3.Connection, levels: list[tuple[str]]):
+        connection.executemany("DELETE FROM actors WHERE level = ?", levels)
+        connection.executemany("DELETE FROM actor_groups WHERE level = ?", levels)
+        connection.executemany("DELETE FROM levels WHERE level = ?", levels)
+
+    def _write_level(self, connection: sqlite3.Connection, level: str, digest: str,
+                     records: list[ActorRecord], groups: list[tuple[str, str, str]]):
+        self._delete_levels(connection, [(level,)])
+
+        for record in records:
+            x, y, z = record.position if record.position is not None else (None, None, None)
+            actor_id = connection.execute(
+                "INSERT INTO actors (level, layer, name, type, actordef, x, y, z) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (level, record.layer, record.name, record.type, record.actordef, x, y, z),
+            ).lastrowid
+            connection.executemany(
+                "INSERT INTO components (actor, component) VALUES (?, ?)",
+                [(actor_id, component) for component in record.components],
+            )
+
+        connection.executemany(
+            "INSERT INTO actor_groups (level, group_name, layer, actor) VALUES (?, ?, ?, ?)",
+            [(level, group_name, layer, actor) for group_name, layer, actor in groups],
+        )
+        connection.execute("INSERT INTO levels (level, digest) VALUES (?, ?)", (level, digest))
+
+    def _resolve_actordefs(self, connection: sqlite3.Connection):
+        """The bmsads can change without the levels changing, so this is done again for every refresh."""
+        connection.execute("DELETE FROM actordefs")
+        connection.executemany(
+            "INSERT INTO actordefs (actordef, bmsad) VALUES (?, ?)",
+            [
+                (actordef, resolve_bmsad(actordef, self._bmsad_names, self._bmsad_by_stem))
+                for (actordef,) in connection.execute("SELECT DISTINCT actordef FROM actors").fetchall()
+            ],
+        )
+
+    def _cached(self, key: tuple, query: typing.Callable[[], T], default: T) -> T:
+        if self._cache_generation != self.generation:
+            self._cache.clear()
+            self._cache_generation = self.generation
+
+        if self._connection is None:
+            return default
+
+        if key not in self._cache:
+            try:
+                self._cache[key] = query()
+            except sqlite3.Error as e:
+                logging.warning(f"Unable to query the actor index: {e}")
+                return default
+        return self._cache[key]
+
+    def close(self):
+        self.cancel()
+        if self._connection is not None:
+            self._connection.close()
+
+    def actor_counts_by_level(self) -> dict[str, int]:
+        def query():
+            return dict(self._connection.execute("SELECT level, count(*) FROM actors GROUP BY level"))
+
+        return self._cached(("actor_counts_by_level",), query, {})
+
+    def actors_using_actordef(self, actordef: str) -> list[ActorRecord]:
+        def query():
+            return [_record_of_row(row) for row in self._connection.execute(
+                f"{_SELECT_RECORDS} WHERE actors.actordef = ? GROUP BY actors.id", (actordef,),
+            )]
+
+        return self._cached(("actors_using_actordef", actordef), query, [])
+
+    def actors_using_bmsad(self, bmsad: str) -> list[ActorRecord]:
+        def query():
+            return [_record_of_row(row) for row in self._connection.execute(
+                f"{_SELECT_RECORDS} JOIN actordefs ON actordefs.actordef = actors.actordef"
+                f" WHERE actordefs.bmsad = ? GROUP BY actors.id", (bmsad,),
+            )]
+
+        return self._cached(("actors_using_bmsad", bmsad), query, [])
+
+    def groups_of_actor(self, level: str, layer: str, actor: str) -> list[str]:
+        def query():
+            return [group_name for (group_name,) in self._connection.execute(
+                "SELECT group_name FROM actor_groups WHERE level = ? AND layer = ? AND actor = ? ORDER BY group_name",
+                (level, layer, actor),
+            )]
+
+        return self._cached(("groups_of_actor", level, layer, actor), query, [])
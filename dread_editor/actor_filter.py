@@ -1,3 +1,4 @@
+import typing
 from typing import Optional
 
 import construct
@@ -6,6 +7,14 @@ import imgui
 from dread_editor import imgui_util
 
 
+def dread_components(actor: construct.Container) -> typing.Iterable[str]:
+    return actor.pComponents.keys() if "pComponents" in actor else ()
+
+
+def dread_actordef(actor: construct.Container) -> str:
+    return actor.get("oActorDefLink", "")
+
+
 class ActorFilter:
     name_filter: str = ""
     case_sensitive_name: bool = False
@@ -14,8 +23,22 @@ class ActorFilter:
 
     _popup_label: str
 
-    def __init__(self):
+    # The filter, compiled from the fields above by `_compile`
+    _compiled_key: Optional[tuple] = None
+    _included_names: tuple[str, ...] = ()
+    _excluded_names: tuple[str, ...] = ()
+    _expected_component: str = ""
+
+    def __init__(self,
+                 components_of: typing.Callable[[construct.Container], typing.Iterable[str]] = dread_components,
+                 actordef_of: typing.Callable[[construct.Container], str] = dread_actordef):
+        """
+        :param components_of: The names of the components of an actor.
+        :param actordef_of: The actordef of an actor.
+        """
         self._popup_label = "Advanced actor filters"
+        self.components_of = components_of
+        self.actordef_of = actordef_of
 
     def draw(self, current_scale: float):
         if imgui.button(f"Filters ##{self._popup_label}"):
@@ -36,31 +59,65 @@ class ActorFilter:
 
             imgui.end_popup()
 
-    def passes(self, actor: construct.Container) -> bool:
-        if self.name_filter:
-            actor_name: str = actor.sName
-            if self.case_sensitive_name:
+    @property
+    def cache_key(self) -> tuple:
+        """Changes whenever the filter would give different results."""
+        return self.name_filter, self.case_sensitive_name, self.expected_component, self.expected_actordef
+
+    @property
+    def is_empty(self) -> bool:
+        self._compile()
+        return not (self._included_names or self._excluded_names
+                    or self.expected_component or self.expected_actordef)
+
+    @property
+    def included_names(self) -> tuple[str, ...]:
+        """The parts of the name filter an actor's name must contain, lowercase if the filter is case insensitive."""
+        self._compile()
+        return self._included_names
+
+    def _compile(self):
+        """Splits and normalizes the name filter only when the fields change, instead of for every actor."""
+        key = self.cache_key
+        if self._compiled_key == key:
+            return
+
+        included, excluded = [], []
+        for criteria in self.name_filter.split(","):
+            criteria = criteria.strip()
+            if not self.case_sensitive_name:
+                criteria = criteria.lower()
+
+            if criteria.startswith("-"):
+                if criteria[1:]:
+                    excluded.append(criteria[1:])
+            elif criteria:
+                included.append(criteria)
+
+        self._included_names = tuple(included)
+        self._excluded_names = tuple(excluded)
+        self._expected_component = self.expected_component.lower()
+        self._compiled_key = key
+
+    def passes(self, actor_name: str, actor: construct.Container) -> bool:
+        self._compile()
+
+        if self._included_names or self._excluded_names:
+            if not self.case_sensitive_name:
                 actor_name = actor_name.lower()
 
-            for criteria in self.name_filter.split(","):
-                criteria = criteria.strip()
-                if self.case_sensitive_name:
-                    criteria = criteria.lower()
-
-                if criteria[0] == "-":
-                    if criteria[1:] in actor_name:
-                        return False
-                else:
-                    if criteria not in actor_name:
-                        return False
-
-        if self.expected_component:
-            if not any(self.expected_component.lower() in component_name.lower()
-                       for component_name in actor.pComponents):
+            if any(criteria in actor_name for criteria in self._excluded_names):
+                return False
+            if not all(criteria in actor_name for criteria in self._included_names):
+                return False
+
+        if self._expected_component:
+            if not any(self._expected_component in component_name.lower()
+                       for component_name in self.components_of(actor)):
                 return False
 
         if self.expected_actordef:
-            if self.expected_actordef not in actor.oActorDefLink:
+            if self.expected_actordef not in self.actordef_of(actor):
                 return False
 
         return True
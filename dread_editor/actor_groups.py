@@ -0,0 +1,38 @@
+import typing
+from typing import Optional
+
+Member = typing.TypeVar("Member", bound=typing.Hashable)
+
+_NO_GROUPS: frozenset[str] = frozenset()
+
+
+def actor_key_of_link(link: str) -> Optional[tuple[str, str]]:
+    """The layer and name of the actor in a Dread actor group link, if it's a link to an actor."""
+    # Root:pScenario:rEntitiesLayer:dctSublayers:<layer>:dctActors:<actor>
+    parts = link.split(":")
+    if len(parts) != 7:
+        return None
+    return parts[4], parts[6]
+
+
+class ActorGroupIndex(typing.Generic[Member]):
+    """The actor groups of a level, and the groups each actor is in."""
+
+    def __init__(self, group_names: typing.Iterable[str], memberships: typing.Iterable[tuple[str, Member]]):
+        self.names: list[str] = sorted(set(group_names))
+        self._groups_of: dict[Member, set[str]] = {}
+        for group_name, member in memberships:
+            self.add(group_name, member)
+
+    def groups_of(self, member: Member) -> typing.AbstractSet[str]:
+        return self._groups_of.get(member, _NO_GROUPS)
+
+    def add(self, group_name: str, member: Member):
+        if (groups := self._groups_of.get(member)) is None:
+            self._groups_of[member] = {group_name}
+        else:
+            groups.add(group_name)
+
+    def remove(self, group_name: str, member: Member):
+        if (groups := self._groups_of.get(member)) is not None:
+            groups.discard(group_name)
@@ -0,0 +1,106 @@
+import typing
+from typing import Optional
+
+import construct
+
+from dread_editor.actor_filter import ActorFilter
+
+ActorKey = tuple[str, str]
+
+# Length of the pieces of actor names that are indexed. Name filters shorter than this can't use the index
+NGRAM_LENGTH = 3
+
+
+def ngrams_of(text: str) -> set[str]:
+    return {text[i:i + NGRAM_LENGTH] for i in range(len(text) - NGRAM_LENGTH + 1)}
+
+
+def _add_to(index: dict[str, set[ActorKey]], values: typing.Iterable[str], key: ActorKey):
+    for value in values:
+        keys = index.get(value)
+        if keys is None:
+            index[value] = {key}
+        else:
+            keys.add(key)
+
+
+class ActorIndex:
+    """Actors by lowercase name n-grams, components and actordef. Candidates still need checking with the filter."""
+
+    def __init__(self, actor_filter: ActorFilter):
+        self.actor_filter = actor_filter
+        self.by_ngram: dict[str, set[ActorKey]] = {}
+        self.by_component: dict[str, set[ActorKey]] = {}
+        self.by_actordef: dict[str, set[ActorKey]] = {}
+        self.all_keys: set[ActorKey] = set()
+        self._indexed: dict[ActorKey, tuple[set[str], tuple[str, ...], str]] = {}
+
+    @classmethod
+    def build(cls, actor_filter: ActorFilter,
+              actors: typing.Iterable[tuple[ActorKey, construct.Container]]) -> "ActorIndex":
+        index = cls(actor_filter)
+        for key, actor in actors:
+            index.add(key, actor)
+        return index
+
+    def add(self, key: ActorKey, actor: construct.Container):
+        if key in self._indexed:
+            self.remove(key)
+
+        ngrams = ngrams_of(key[1].lower())
+        components = tuple(component.lower() for component in self.actor_filter.components_of(actor))
+        actordef = self.actor_filter.actordef_of(actor)
+
+        _add_to(self.by_ngram, ngrams, key)
+        _add_to(self.by_component, components, key)
+        _add_to(self.by_actordef, (actordef,), key)
+        self.all_keys.add(key)
+        self._indexed[key] = ngrams, components, actordef
+
+    def remove(self, key: ActorKey):
+        if key not in self._indexed:
+            return
+
+        ngrams, components, actordef = self._indexed.pop(key)
+        for ngram in ngrams:
+            self.by_ngram[ngram].discard(key)
+        for component in components:
+            self.by_component[component].discard(key)
+        self.by_actordef[actordef].discard(key)
+        self.all_keys.discard(key)
+
+    def update(self, key: ActorKey, actor: Optional[construct.Container]):
+        """Re-indexes the actor after it was added or edited. None means it no longer exists."""
+        if actor is None:
+            self.remove(key)
+        else:
+            self.add(key, actor)
+
+    def candidates(self) -> set[ActorKey]:
+        """All actors that might pass the filter. Actors not in this set certainly don't."""
+        narrowed: list[set[ActorKey]] = []
+        actor_filter = self.actor_filter
+
+        for criteria in actor_filter.included_names:
+            if len(criteria) >= NGRAM_LENGTH:
+                for ngram in ngrams_of(criteria.lower()):
+                    narrowed.append(self.by_ngram.get(ngram, set()))
+
+        if actor_filter.expected_component:
+            expected = actor_filter.expected_component.lower()
+            narrowed.append(set().union(*(
+                keys for component, keys in self.by_component.items()
+                if expected in component
+            )))
+
+        if actor_filter.expected_actordef:
+            narrowed.append(set().union(*(
+                keys for actordef, keys in self.by_actordef.items()
+                if actor_filter.expected_actordef in actordef
+            )))
+
+        if not narrowed:
+            return self.all_keys
+
+        narrowed.sort(key=len)
+        return narrowed[0].intersection(*narrowed[1:])
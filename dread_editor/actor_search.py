@@ -0,0 +1,239 @@
+import concurrent.futures
+import logging
+import os
+import typing
+from pathlib import Path
+from typing import Optional
+
+import imgui
+from mercury_engine_data_structures.file_tree_editor import FileTreeEditor, Game
+
+from dread_editor import imgui_util
+from dread_editor.actor_filter import ActorFilter
+
+if typing.TYPE_CHECKING:
+    from dread_editor.actor_database import ActorDatabase
+
+
+class ActorRecord(typing.NamedTuple):
+    """The parts of an actor the global search needs, small enough to send between processes."""
+    level: str
+    layer: str
+    name: str
+    type: str
+    actordef: str
+    components: tuple[str, ...]
+    position: Optional[tuple[float, float, float]]
+
+
+def _record_components(record: ActorRecord) -> tuple[str, ...]:
+    return record.components
+
+
+def _record_actordef(record: ActorRecord) -> str:
+    return record.actordef
+
+
+# The FileTreeEditor of each worker process, created once by `init_worker` and reused for every level
+_worker_editor: Optional[FileTreeEditor] = None
+
+
+def init_worker(root: Path, game: Game):
+    """Initializer for process pools that read the RomFS at the given root."""
+    global _worker_editor
+    _worker_editor = FileTreeEditor(root, game)
+
+
+def worker_editor() -> FileTreeEditor:
+    return _worker_editor
+
+
+# Each worker has a FileTreeEditor of its own, so only a few are started, leaving a core for the editor
+MAX_WORKERS = 4
+
+
+def make_worker_pool(root: Path, game: Game) -> concurrent.futures.ProcessPoolExecutor:
+    """The pool that reads the RomFS at the given root, shared by the global search and the actor index."""
+    return concurrent.futures.ProcessPoolExecutor(
+        max_workers=max(1, min(MAX_WORKERS, (os.cpu_count() or 2) - 1)),
+        initializer=init_worker,
+        initargs=(root, game),
+    )
+
+
+def _position_of(position) -> Optional[tuple[float, float, float]]:
+    if position is None:
+        return None
+    return float(position[0]), float(position[1]), float(position[2])
+
+
+def _dread_records(level: str, brfld) -> list[ActorRecord]:
+    return [
+        ActorRecord(
+            level, layer_name, actor_name,
+            actor.get("@type", ""),
+            actor.get("oActorDefLink", ""),
+            tuple(actor.pComponents.keys()) if "pComponents" in actor else (),
+            _position_of(actor.get("vPos")),
+        )
+        for layer_name in brfld.all_layers()
+        for actor_name, actor in brfld.actors_for_layer(layer_name).items()
+    ]
+
+
+def _sr_records(level: str, bmsld) -> list[ActorRecord]:
+    return [
+        ActorRecord(
+            level, str(layer_index), actor_name,
+            actor.get("type", ""),
+            actor.get("type", ""),
+            tuple(component.component_type for component in actor.get("components", ())),
+            _position_of(actor.get("position")),
+        )
+        for layer_index, actors in enumerate(bmsld.raw.actors)
+        for actor_name, actor in actors.items()
+    ]
+
+
+def records_of_level(level: str, game: Game, parsed) -> list[ActorRecord]:
+    """A record for each actor of the given parsed brfld or bmsld."""
+    if game == Game.SAMUS_RETURNS:
+        return _sr_records(level, parsed)
+    return _dread_records(level, parsed)
+
+
+def extract_records(level: str, game: Game) -> list[ActorRecord]:
+    """Runs in a worker process: parses the level and returns a record for each of its actors."""
+    return records_of_level(level, game, _worker_editor.get_parsed_asset(level))
+
+
+# x position of each column of the results, before scaling
+_COLUMNS = (
+    ("Level", 0),
+    ("Layer", 260),
+    ("Name", 400),
+    ("Type", 640),
+    ("Actordef", 820),
+    ("Components", 1160),
+    ("Position", 1460),
+)
+
+
+class ActorSearch:
+    """Searches the actors of every level in a RomFS, parsing them in the pool from `make_worker_pool`."""
+    _is_open: bool = False
+    _started: bool = False
+    actor_database: Optional["ActorDatabase"] = None
+
+    def __init__(self, pool: concurrent.futures.ProcessPoolExecutor, game: Game, level_files: list[str]):
+        self.pool = pool
+        self.game = game
+        self.level_files = level_files
+        self.actor_filter = ActorFilter(_record_components, _record_actordef)
+
+        self.records: list[ActorRecord] = []
+        self.errors: dict[str, str] = {}
+        self._pending: dict[concurrent.futures.Future, str] = {}
+
+        # Records that pass the filter, and how many of `records` were already checked for it
+        self._matches: list[ActorRecord] = []
+        self._matches_key: Optional[tuple] = None
+        self._checked_count = 0
+
+    def is_open(self) -> bool:
+        return self._is_open
+
+    def is_searching(self) -> bool:
+        return bool(self._pending)
+
+    def menu_item(self):
+        click, new_state = imgui.menu_item("Search actors in all levels", "", self._is_open)
+        if click:
+            self._is_open = new_state
+            if self._is_open and not self._started:
+                self.start()
+
+    def start(self):
+        """Parses all levels. Only done once, the results are kept when the window is closed and opened again."""
+        self._started = True
+        for level in self.level_files:
+            self._pending[self.pool.submit(extract_records, level, self.game)] = level
+
+    def close(self):
+        """Stops the search, without waiting for the levels being parsed. The pool is left to its owner."""
+        for future in self._pending:
+            future.cancel()
+        self._pending.clear()
+
+    def poll(self):
+        """Moves the records of the levels that finished since the last frame into the results. Never blocks."""
+        for future in [future for future in self._pending if future.done()]:
+            level = self._pending.pop(future)
+            try:
+                self.records.extend(future.result())
+            except Exception as e:
+                logging.exception(f"Unable to search actors of {level}: {e}")
+                self.errors[level] = str(e)
+
+    def matches(self) -> list[ActorRecord]:
+        """The records that pass the filter. Only the records that arrived since the last call are checked."""
+        if self._matches_key != self.actor_filter.cache_key:
+            self._matches = []
+            self._matches_key = self.actor_filter.cache_key
+            self._checked_count = 0
+
+        passes = self.actor_filter.passes
+        self._matches.extend(
+            record for record in self.records[self._checked_count:]
+            if passes(record.name, record)
+        )
+        self._checked_count = len(self.records)
+        return self._matches
+
+    def draw(self, current_scale: float) -> Optional[ActorRecord]:
+        """Draws the search window. Returns the record that was clicked, if any."""
+        imgui.set_next_window_size(900 * current_scale, 400 * current_scale, imgui.FIRST_USE_EVER)
+        active = imgui.begin("Actor Search", True)[1]
+        if not active:
+            imgui.end()
+            self._is_open = False
+            return None
+
+        self.actor_filter.draw(current_scale)
+        imgui.same_line()
+        matches = self.matches()
+        done = len(self.level_files) - len(self._pending)
+        imgui.text(f"{len(matches)} of {len(self.records)} actors, {done} of {len(self.level_files)} levels")
+        if self._pending:
+            imgui.same_line()
+            imgui.progress_bar(done / max(len(self.level_files), 1), (100 * current_scale, 0))
+
+        for level, error in self.errors.items():
+            imgui.text_colored(f"{level}: {error}", 1, 0.3, 0.3)
+
+        for label, x in _COLUMNS:
+            if x > 0:
+                imgui.same_line(x * current_scale)
+            imgui.text(label)
+        imgui.separator()
+
+        clicked = None
+        with imgui_util.with_child("##ActorSearchResults", 0, 0):
+            for i in imgui_util.clipped_rows(len(matches), imgui.get_text_line_height()):
+                record = matches[i]
+                if imgui.selectable(f"{record.level}##actor_search_{i}")[0]:
+                    clicked = record
+                if self.actor_database is not None and imgui.is_item_hovered():
+                    groups = self.actor_database.groups_of_actor(record.level, record.layer, record.name)
+                    imgui.set_tooltip(f"Actor groups: {', '.join(groups)}" if groups else "Not in any actor group")
+
+                position = ""
+                if record.position is not None:
+                    position = "{:.0f}, {:.0f}, {:.0f}".format(*record.position)
+                for (_, x), text in zip(_COLUMNS[1:], (record.layer, record.name, record.type, record.actordef,
+                                                       ", ".join(record.components), position)):
+                    imgui.same_line(x * current_scale)
+                    imgui.text(text)
+
+        imgui.end()
+        return clicked
@@ -0,0 +1,112 @@
+import hashlib
+import importlib.metadata
+import json
+import logging
+import os
+from pathlib import Path
+from typing import Optional
+
+from mercury_engine_data_structures.file_tree_editor import Game
+
+from dread_editor.asset_catalogue import AssetCatalogue
+from dread_editor import preferences
+
+# Name of the cache file, in the data directory
+_CACHE_FILE_NAME = "asset_cache.json"
+
+# Bump whenever the cached data changes shape
+_CACHE_VERSION = 1
+
+
+def _library_version() -> str:
+    try:
+        return importlib.metadata.version("mercury-engine-data-structures")
+    except importlib.metadata.PackageNotFoundError:
+        # Frozen builds might not have the distribution metadata
+        try:
+            from mercury_engine_data_structures.version import version
+            return version
+        except ImportError:
+            return "unknown"
+
+
+# The asset names come from mercury-engine-data-structures, so a new version of it may know different names
+_LIBRARY_VERSION = _library_version()
+
+# Files that change the known asset names without touching the pkgs
+_NAMING_FILES = ("system/files.toc", "custom_names.json")
+
+
+def romfs_fingerprint(root: Path) -> str:
+    """
+    A cheap fingerprint of a RomFS, using only the stat of the directories, pkgs and naming files.
+    Adding or removing any file changes the mtime of the directory that contains it.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(str(root.absolute()).encode("utf-8"))
+
+    for directory, directory_names, file_names in os.walk(root):
+        directory_names.sort()
+        relative = os.path.relpath(directory, root)
+        digest.update(f"d:{relative}:{os.stat(directory).st_mtime_ns}\n".encode("utf-8"))
+
+        for file_name in sorted(file_names):
+            if file_name.endswith(".pkg"):
+                stat = os.stat(os.path.join(directory, file_name))
+                digest.update(f"f:{relative}/{file_name}:{stat.st_mtime_ns}:{stat.st_size}\n".encode("utf-8"))
+
+    for name in _NAMING_FILES:
+        path = root.joinpath(name)
+        if path.is_file():
+            stat = path.stat()
+            digest.update(f"n:{name}:{stat.st_mtime_ns}:{stat.st_size}\n".encode("utf-8"))
+
+    return digest.hexdigest()
+
+
+def _read_cache() -> dict:
+    asset_cache_file_path = preferences.data_file_path(_CACHE_FILE_NAME)
+    if asset_cache_file_path.exists():
+        try:
+            data = json.loads(asset_cache_file_path.read_text())
+            if data.get("version") == _CACHE_VERSION:
+                return data
+        except (IOError, ValueError) as e:
+            logging.warning(f"Ignoring invalid asset cache: {e}")
+
+    return {"version": _CACHE_VERSION, "roots": {}}
+
+
+def load_cached_catalogue(root: Path, game: Game, fingerprint: str) -> Optional[AssetCatalogue]:
+    entry = _read_cache()["roots"].get(str(root.absolute()))
+    if entry is None:
+        return None
+
+    try:
+        if (entry["game"] != game.value or entry["fingerprint"] != fingerprint
+                or entry.get("library_version") != _LIBRARY_VERSION):
+            return None
+        return AssetCatalogue.from_json(entry["catalogue"])
+    except (KeyError, TypeError, AttributeError) as e:
+        logging.warning(f"Ignoring invalid asset cache entry for {root}: {e}")
+        return None
+
+
+def save_catalogue_cache(root: Path, game: Game, fingerprint: str, catalogue: AssetCatalogue):
+    data = _read_cache()
+    data["roots"][str(root.absolute())] = {
+        "game": game.value,
+        "fingerprint": fingerprint,
+        "library_version": _LIBRARY_VERSION,
+        "catalogue": catalogue.as_json(),
+    }
+
+    # Written to another file first, so a crash while writing never leaves a truncated cache
+    asset_cache_file_path = preferences.data_file_path(_CACHE_FILE_NAME)
+    temporary_path = asset_cache_file_path.with_name(f"{_CACHE_FILE_NAME}.tmp")
+    try:
+        with temporary_path.open("w") as f:
+            json.dump(data, f)
+        os.replace(temporary_path, asset_cache_file_path)
+    except IOError as e:
+        logging.warning(f"Unable to save asset cache: {e}")
@@ -0,0 +1,64 @@
+import typing
+
+FileTree = dict[str, typing.Union[bool, "FileTree"]]
+
+
+def extension_of(asset_name: str) -> str:
+    """The extension of the given asset name, including the dot. Empty if there's no extension."""
+    file_name = asset_name.rpartition("/")[2]
+    base, dot, extension = file_name.rpartition(".")
+    if not dot or not base:
+        return ""
+    return f".{extension}"
+
+
+class AssetCatalogue:
+    """All asset names of a RomFS, sorted and bucketed by extension."""
+    all_names: list[str]
+    by_extension: dict[str, list[str]]
+    file_tree: FileTree
+    actordefs: list[str]
+
+    def __init__(self, all_names: list[str], by_extension: dict[str, list[str]], file_tree: FileTree):
+        self.all_names = all_names
+        self.by_extension = by_extension
+        self.file_tree = file_tree
+        self.actordefs = [f"actordef:{asset_name}" for asset_name in self.with_extension(".bmsad")]
+
+    @classmethod
+    def from_asset_names(cls, asset_names: typing.Iterable[str]) -> "AssetCatalogue":
+        all_names = sorted(asset_names)
+        by_extension = {}
+        file_tree = {}
+
+        # Everything is inserted in sorted order, so the buckets and the tree are already sorted
+        for asset_name in all_names:
+            extension = extension_of(asset_name)
+            if extension not in by_extension:
+                by_extension[extension] = []
+            by_extension[extension].append(asset_name)
+
+            *directories, file_name = asset_name.split("/")
+            parent = file_tree
+            for segment in directories:
+                if segment not in parent:
+                    parent[segment] = {}
+                parent = parent[segment]
+            parent[file_name] = True
+
+        return cls(all_names, by_extension, file_tree)
+
+    @classmethod
+    def from_json(cls, data: dict) -> "AssetCatalogue":
+        return cls(data["all_names"], data["by_extension"], data["file_tree"])
+
+    def as_json(self) -> dict:
+        return {
+            "all_names": self.all_names,
+            "by_extension": self.by_extension,
+            "file_tree": self.file_tree,
+        }
+
+    def with_extension(self, extension: str) -> list[str]:
+        """Sorted list of all assets with the given extension, which must include the dot."""
+        return self.by_extension.get(extension, [])
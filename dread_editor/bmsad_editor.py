@@ -69,7 +69,7 @@ class BmsadEditor(FileEditor):
                                 f"Fields ##{component_key}_fields", imgui.TREE_NODE_DEFAULT_OPEN):
                             changed, new_field = self.bmsad_tree_render.render_value_of_type(
                                 component.fields.fields,
-                                self.type_lib.get_type(find_charclass_for_type(component.type)),
+                                self.bmsad_tree_render.metadata.get_type(find_charclass_for_type(component.type)),
                                 f"{component_key}"
                             )
                             if changed:
@@ -1,10 +1,13 @@
 import typing
+from typing import Optional
 
 import imgui
 from mercury_engine_data_structures.type_lib import get_type_lib_dread
 from mercury_engine_data_structures.file_tree_editor import FileTreeEditor, Game
 from mercury_engine_data_structures.formats import Bmsad
 
+from dread_editor.actor_database import ActorDatabase
+from dread_editor.asset_catalogue import AssetCatalogue
 from dread_editor.bmsad_editor import BmsadEditor
 from dread_editor.file_editor import FileEditor, GenericEditor
 from dread_editor.type_render import TypeTreeRender
@@ -40,21 +43,14 @@ file_types = {
 class FileBrowser:
     _is_open: bool = False
     filter: str = ""
+    actor_database: Optional[ActorDatabase] = None
 
-    def __init__(self, tree_editor: FileTreeEditor, game: Game):
+    def __init__(self, tree_editor: Optional[FileTreeEditor], catalogue: AssetCatalogue, game: Game):
         self.tree_editor = tree_editor
-        self.all_files_tree = {}
+        self.catalogue = catalogue
+        self.all_files_tree = catalogue.file_tree
         self.game = game
 
-        for asset_name in sorted(tree_editor.all_asset_names()):
-            name_tree = asset_name.split("/")
-            parent = self.all_files_tree
-            for segment in name_tree[:-1]:
-                if segment not in parent:
-                    parent[segment] = {}
-                parent = parent[segment]
-            parent[name_tree[-1]] = True
-
     def is_open(self):
         return self._is_open
 
@@ -100,6 +96,11 @@ class FileBrowser:
                     imgui.text(name)
 
                     if imgui.begin_popup_context_item(f"##{full_name}"):
+                        if self.tree_editor is None:
+                            imgui.text_disabled("The RomFS is still loading")
+                            imgui.end_popup()
+                            continue
+
                         if imgui.button("Extract file"):
                             full_path = self.tree_editor.root.joinpath(full_name)
                             full_path.parent.mkdir(parents=True, exist_ok=True)
@@ -110,8 +111,20 @@ class FileBrowser:
                                 if imgui.button("Open"):
                                     open_editors[full_name] = build(full_name, self.tree_editor)
 
+                        if name.endswith(".bmsad") and self.actor_database is not None:
+                            self.draw_references(full_name)
+
                         imgui.end_popup()
 
         draw_tree("", self.all_files_tree)
         imgui.end()
         return
+
+    def draw_references(self, bmsad: str):
+        references = self.actor_database.actors_using_bmsad(bmsad)
+        imgui.separator()
+        imgui.text(f"Used by {len(references)} actors")
+        for record in references[:20]:
+            imgui.text_disabled(f"{record.level} - {record.layer} - {record.name}")
+        if len(references) > 20:
+            imgui.text_disabled(f"... and {len(references) - 20} more")
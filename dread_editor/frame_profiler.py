@@ -0,0 +1,139 @@
+import cProfile
+import logging
+import os
+import pstats
+import time
+from pathlib import Path
+from typing import Optional
+
+import imgui
+
+# How many functions are listed in each report table
+_REPORT_SIZE = 40
+
+
+class ProfileRow:
+    def __init__(self, function: tuple[str, int, str], stat: tuple):
+        primitive_calls, total_calls, self_time, cumulative_time, _ = stat
+        file_name, line, name = function
+        self.label = f"{name} ({os.path.basename(file_name)}:{line})" if line else name
+        self.location = f"{file_name}:{line}"
+        self.calls = f"{total_calls}/{primitive_calls}" if total_calls != primitive_calls else str(total_calls)
+        self.self_time = self_time
+        self.cumulative_time = cumulative_time
+
+
+class FrameProfiler:
+    """Runs cProfile for the next N frames, then shows the slowest functions and saves the `.prof` file."""
+    frames_to_capture: int = 60
+    show_report: bool = False
+    saved_path: Optional[Path] = None
+
+    def __init__(self, output_directory: Path):
+        self.output_directory = output_directory
+        self._profile: Optional[cProfile.Profile] = None
+        # Capture was requested in the middle of a frame, and starts with the next one
+        self._start_pending = False
+        self._remaining_frames = 0
+        self._captured_frames = 0
+        self.by_cumulative: list[ProfileRow] = []
+        self.by_self: list[ProfileRow] = []
+
+    def is_capturing(self) -> bool:
+        return self._start_pending or self._profile is not None
+
+    def start_capture(self):
+        self._start_pending = True
+        self._remaining_frames = self.frames_to_capture
+
+    def begin_frame(self):
+        if self._start_pending:
+            self._start_pending = False
+            self._profile = cProfile.Profile()
+            self._captured_frames = 0
+
+        if self._profile is not None:
+            self._profile.enable()
+
+    def end_frame(self):
+        if self._profile is None:
+            return
+
+        self._profile.disable()
+        self._captured_frames += 1
+        self._remaining_frames -= 1
+        if self._remaining_frames <= 0:
+            self._finish_capture()
+
+    def _finish_capture(self):
+        profile, self._profile = self._profile, None
+        if self._captured_frames == 0:
+            # pstats can't read a profile without any calls
+            return
+
+        self.saved_path = self.output_directory.joinpath(f"profile_{time.strftime('%Y%m%d_%H%M%S')}.prof")
+        try:
+            profile.dump_stats(self.saved_path)
+        except IOError as e:
+            logging.warning(f"Unable to save profile: {e}")
+            self.saved_path = None
+
+        stats = pstats.Stats(profile)
+        rows = [ProfileRow(function, stat) for function, stat in stats.stats.items()]
+        self.by_cumulative = sorted(rows, key=lambda row: row.cumulative_time, reverse=True)[:_REPORT_SIZE]
+        self.by_self = sorted(rows, key=lambda row: row.self_time, reverse=True)[:_REPORT_SIZE]
+        self.show_report = True
+
+    def menu_items(self):
+        if self.is_capturing():
+            imgui.text_disabled(f"Profiling... {self._remaining_frames} frames left")
+        elif imgui.menu_item(f"Profile next {self.frames_to_capture} frames")[0]:
+            self.start_capture()
+
+        self.frames_to_capture = imgui.slider_int("Frames to profile", self.frames_to_capture, 1, 600)[1]
+        self.show_report = imgui.menu_item("Show profile report", "", self.show_report,
+                                           bool(self.by_cumulative))[1]
+
+    def _draw_table(self, label: str, rows: list[ProfileRow]):
+        imgui.columns(4, label)
+        for header in ("Function", "Calls", "Self (ms)", "Cumulative (ms)"):
+            imgui.text(header)
+            imgui.next_column()
+        imgui.separator()
+
+        for row in rows:
+            imgui.text(row.label)
+            if imgui.is_item_hovered():
+                imgui.set_tooltip(row.location)
+            imgui.next_column()
+            imgui.text(row.calls)
+            imgui.next_column()
+            imgui.text(f"{row.self_time * 1000:.2f}")
+            imgui.next_column()
+            imgui.text(f"{row.cumulative_time * 1000:.2f}")
+            imgui.next_column()
+
+        imgui.columns(1, label)
+
+    def draw_report(self, current_scale: float):
+        if not self.show_report:
+            return
+
+        imgui.set_next_window_size(800 * current_scale, 500 * current_scale, imgui.FIRST_USE_EVER)
+        expanded, self.show_report = imgui.begin("Profile Report", True)
+        if not expanded:
+            imgui.end()
+            return
+
+        imgui.text(f"Captured {self._captured_frames} frames.")
+        if self.saved_path is not None:
+            imgui.same_line()
+            imgui.text_disabled(f"Saved to {self.saved_path}")
+
+        if imgui.collapsing_header("By cumulative time", None, imgui.TREE_NODE_DEFAULT_OPEN)[0]:
+            self._draw_table("profile by cumulative", self.by_cumulative)
+
+        if imgui.collapsing_header("By self time", None, imgui.TREE_NODE_DEFAULT_OPEN)[0]:
+            self._draw_table("profile by self", self.by_self)
+
+        imgui.end()
@@ -0,0 +1,70 @@
+import time
+from typing import Optional
+
+import glfw
+from imgui.integrations.glfw import GlfwRenderer
+
+from dread_editor.preferences import global_preferences
+
+# ImGui needs a few frames after an input to settle hover highlights, popups and layout
+_FRAMES_AFTER_INPUT = 3
+
+# Even when idle, wake up now and then so timers and background state get drawn
+_IDLE_TIMEOUT = 0.5
+
+
+class FrameThrottle:
+    """Decides how long the main loop waits for input before drawing the next frame."""
+
+    def __init__(self, window, renderer: GlfwRenderer):
+        self.window = window
+        self.renderer = renderer
+        self._active_frames = _FRAMES_AFTER_INPUT
+        self._last_frame_time = time.perf_counter()
+
+        glfw.set_key_callback(window, self._forward("keyboard_callback"))
+        glfw.set_cursor_pos_callback(window, self._forward("mouse_callback"))
+        glfw.set_window_size_callback(window, self._forward("resize_callback"))
+        glfw.set_char_callback(window, self._forward("char_callback"))
+        glfw.set_scroll_callback(window, self._forward("scroll_callback"))
+        glfw.set_mouse_button_callback(window, self._forward(None))
+        glfw.set_window_focus_callback(window, self._forward(None))
+        glfw.set_window_refresh_callback(window, self._forward(None))
+
+    def _forward(self, callback_name: Optional[str]):
+        # Looked up on each call, so the renderer's callbacks can be replaced later on
+        def wrapped(*args):
+            self.notify_input()
+            if callback_name is not None:
+                getattr(self.renderer, callback_name)(*args)
+
+        return wrapped
+
+    @property
+    def idle_mode(self) -> bool:
+        return global_preferences.get("idle_mode", True)
+
+    @property
+    def frame_cap(self) -> int:
+        """Maximum frames per second, or 0 for no limit."""
+        return global_preferences.get("frame_cap", 60)
+
+    def notify_input(self):
+        self._active_frames = _FRAMES_AFTER_INPUT
+
+    def wait_for_next_frame(self, busy: bool):
+        """
+        Processes pending events, waiting as needed.
+        :param busy: If something other than input needs new frames, like a background job.
+        """
+        if self.idle_mode and not busy and self._active_frames == 0:
+            glfw.wait_events_timeout(_IDLE_TIMEOUT)
+        else:
+            if self.frame_cap > 0:
+                remaining = self._last_frame_time + 1 / self.frame_cap - time.perf_counter()
+                if remaining > 0:
+                    time.sleep(remaining)
+            glfw.poll_events()
+
+        self._active_frames = max(0, self._active_frames - 1)
+        self._last_frame_time = time.perf_counter()
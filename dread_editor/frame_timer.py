@@ -0,0 +1,103 @@
+import collections
+import contextlib
+import csv
+import math
+import time
+from pathlib import Path
+from typing import Optional
+
+import imgui
+
+TOTAL_SECTION = "total"
+
+
+def percentile(sorted_samples: list[float], fraction: float) -> float:
+    index = max(0, math.ceil(fraction * len(sorted_samples)) - 1)
+    return sorted_samples[index]
+
+
+class FrameTimer:
+    """How long each named section of the last `max_frames` frames took."""
+    show_overlay: bool = False
+    last_dump: Optional[Path] = None
+
+    def __init__(self, max_frames: int = 300):
+        self.max_frames = max_frames
+        self.frames: collections.deque[dict[str, float]] = collections.deque(maxlen=max_frames)
+        self.section_names: list[str] = []
+        self._current: dict[str, float] = {}
+        self._frame_start = time.perf_counter()
+
+    def begin_frame(self):
+        self._current = {}
+        self._frame_start = time.perf_counter()
+
+    def end_frame(self):
+        self._current[TOTAL_SECTION] = time.perf_counter() - self._frame_start
+        self.frames.append(self._current)
+
+    @contextlib.contextmanager
+    def section(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            if name not in self._current and name not in self.section_names:
+                self.section_names.append(name)
+            self._current[name] = self._current.get(name, 0.0) + time.perf_counter() - start
+
+    def samples_for(self, name: str) -> list[float]:
+        return [frame.get(name, 0.0) for frame in self.frames]
+
+    def stats_for(self, name: str) -> tuple[float, float, float]:
+        """Min, average and 99th percentile of the given section, in seconds."""
+        samples = sorted(self.samples_for(name))
+        if not samples:
+            return 0.0, 0.0, 0.0
+        return samples[0], sum(samples) / len(samples), percentile(samples, 0.99)
+
+    def dump_csv(self, path: Path):
+        names = [TOTAL_SECTION, *self.section_names]
+        with path.open("w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(["frame", *(f"{name} (ms)" for name in names)])
+            for i, frame in enumerate(self.frames):
+                writer.writerow([i, *(f"{frame.get(name, 0.0) * 1000:.4f}" for name in names)])
+
+    def menu_item(self):
+        self.show_overlay = imgui.menu_item("Show frame timings", "", self.show_overlay)[1]
+
+    def draw_overlay(self, current_scale: float, dump_directory: Path):
+        if not self.show_overlay:
+            return
+
+        imgui.set_next_window_size(450 * current_scale, 250 * current_scale, imgui.FIRST_USE_EVER)
+        expanded, self.show_overlay = imgui.begin("Frame Timings", True)
+        if not expanded:
+            imgui.end()
+            return
+
+        imgui.text(f"Last {len(self.frames)} frames, in milliseconds")
+        if imgui.button("Save samples to CSV"):
+            self.last_dump = dump_directory.joinpath(f"frame_timings_{time.strftime('%Y%m%d_%H%M%S')}.csv")
+            self.dump_csv(self.last_dump)
+        if self.last_dump is not None:
+            imgui.same_line()
+            imgui.text_disabled(f"Saved to {self.last_dump}")
+
+        imgui.separator()
+        imgui.columns(4, "frame timings")
+        for header in ("Section", "Min", "Avg", "P99"):
+            imgui.text(header)
+            imgui.next_column()
+        imgui.separator()
+
+        for name in [TOTAL_SECTION, *self.section_names]:
+            imgui.text(name)
+            imgui.next_column()
+            for value in self.stats_for(name):
+                imgui.text(f"{value * 1000:.2f}")
+                imgui.next_column()
+
+        imgui.columns(1, "frame timings")
+        imgui.end()
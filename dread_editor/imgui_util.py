@@ -1,4 +1,6 @@
 import contextlib
+import functools
+import math
 import typing
 
 import imgui
@@ -37,6 +39,30 @@ def set_hovered_tooltip(tooltip: str):
         imgui.set_tooltip(tooltip)
 
 
+def clipped_rows(count: int, line_height: typing.Optional[float] = None) -> typing.Iterator[int]:
+    """
+    Yields the indices of the rows that are visible in the current window, adding empty space in place of the
+    others so the scrollbar still accounts for all of them. Each row must be a single line of widgets with the
+    given height, by default the frame height of widgets like a checkbox.
+    pyimgui doesn't expose ImGuiListClipper, so this does the same for fixed height rows.
+    """
+    spacing = imgui.get_frame_height_with_spacing() - imgui.get_frame_height()
+    if line_height is None:
+        line_height = imgui.get_frame_height()
+    row_height = line_height + spacing
+    start_y = imgui.get_cursor_pos_y()
+    scroll_y = imgui.get_scroll_y()
+
+    first = max(0, min(count, math.floor((scroll_y - start_y) / row_height)))
+    last = max(first, min(count, math.ceil((scroll_y + imgui.get_window_height() - start_y) / row_height)))
+
+    if first > 0:
+        imgui.dummy(1, first * row_height - spacing)
+    yield from range(first, last)
+    if last < count:
+        imgui.dummy(1, (count - last) * row_height - spacing)
+
+
 _input_text_persistence = {}
 
 
@@ -56,9 +82,16 @@ def combo_str(label: str, current: str, items: list[str], height_in_items: int =
     return changed, selected
 
 
-def combo_enum(label: str, current: T, enum_class: typing.Type[T], height_in_items: int = -1) -> tuple[bool, T]:
+@functools.lru_cache(maxsize=None)
+def _enum_choices(enum_class: typing.Type[T]) -> tuple[list[T], list[str], dict[T, int]]:
+    """The members of the enum, their names and the index of each, built once per enum."""
     items: list[T] = list(enum_class)
-    changed, selected = imgui.combo(label, items.index(current), [x.name for x in items], height_in_items)
+    return items, [x.name for x in items], {item: index for index, item in enumerate(items)}
+
+
+def combo_enum(label: str, current: T, enum_class: typing.Type[T], height_in_items: int = -1) -> tuple[bool, T]:
+    items, names, indices = _enum_choices(enum_class)
+    changed, selected = imgui.combo(label, indices[current], names, height_in_items)
     selected = items[selected]
     return changed, selected
 
@@ -0,0 +1,261 @@
+import json
+import typing
+from pathlib import Path
+from typing import Optional
+
+import glfw
+import imgui
+from imgui.integrations.glfw import GlfwRenderer
+
+from dread_editor import preferences
+from dread_editor.frame_timer import FrameTimer, TOTAL_SECTION
+from dread_editor.preferences import global_preferences
+
+_RECORDING_VERSION = 1
+
+
+class InputSession:
+    """Where the main loop gets its input from. Subclasses record it to a file or replay a recording."""
+
+    def __init__(self, window, renderer: GlfwRenderer):
+        self.window = window
+        self.renderer = renderer
+
+    @property
+    def frame_count(self) -> Optional[int]:
+        """How many frames this session will run for, if known."""
+        return None
+
+    @property
+    def throttled(self) -> bool:
+        """If the main loop can wait for input and respect the frame cap."""
+        return True
+
+    @property
+    def runs_background_jobs(self) -> bool:
+        """
+        If optional background work like the actor search and index can run. Their results arrive on different
+        frames every time, so recorded sessions don't run them.
+        """
+        return True
+
+    def begin(self):
+        """Called once the preferences are loaded."""
+
+    def process_inputs(self):
+        self.renderer.process_inputs()
+
+    def content_scale(self) -> float:
+        return glfw.get_window_content_scale(self.window)[0]
+
+    def prompt_file(self, prompt: typing.Callable[[], str]) -> str:
+        return prompt()
+
+    def sync(self, event: str, ready: bool, wait: typing.Callable[[], None]) -> bool:
+        """
+        Checks if the main loop should act on something happening in the background, like a RomFS load.
+        Replays use this to act on the same frame as it happened in the recording.
+        """
+        return ready
+
+    def end_frame(self):
+        pass
+
+    def is_finished(self) -> bool:
+        return False
+
+    def close(self, frame_timer: FrameTimer):
+        pass
+
+
+class InputRecorder(InputSession):
+    """Writes the input of each frame to a JSON lines file, to be replayed later."""
+
+    def __init__(self, window, renderer: GlfwRenderer, path: Path):
+        super().__init__(window, renderer)
+        self.path = path
+        self._file = path.open("w")
+        self._frame: dict = {}
+        self._key_events: list[list[int]] = []
+        self._characters: list[int] = []
+
+        keyboard_callback = renderer.keyboard_callback
+        char_callback = renderer.char_callback
+
+        def record_key(window, key, scancode, action, mods):
+            self._key_events.append([key, scancode, action, mods])
+            keyboard_callback(window, key, scancode, action, mods)
+
+        def record_char(window, char):
+            self._characters.append(char)
+            char_callback(window, char)
+
+        renderer.keyboard_callback = record_key
+        renderer.char_callback = record_char
+
+    @property
+    def runs_background_jobs(self) -> bool:
+        return False
+
+    def begin(self):
+        # Window layouts from imgui.ini would make the replay diverge
+        imgui.get_io().ini_file_name = None
+        self._write({
+            "version": _RECORDING_VERSION,
+            "window_size": list(glfw.get_window_size(self.window)),
+            "preferences": global_preferences,
+        })
+
+    def _write(self, data: dict):
+        self._file.write(json.dumps(data))
+        self._file.write("\n")
+
+    def process_inputs(self):
+        super().process_inputs()
+        io = imgui.get_io()
+        self._frame = {
+            "size": list(io.display_size),
+            "scale": super().content_scale(),
+            "dt": io.delta_time,
+            "mouse": list(io.mouse_pos),
+            "buttons": [bool(io.mouse_down[i]) for i in range(3)],
+            "wheel": [io.mouse_wheel_horizontal, io.mouse_wheel],
+        }
+        if self._key_events:
+            self._frame["keys"] = self._key_events
+            self._key_events = []
+        if self._characters:
+            self._frame["chars"] = self._characters
+            self._characters = []
+
+    def content_scale(self) -> float:
+        return self._frame["scale"]
+
+    def prompt_file(self, prompt: typing.Callable[[], str]) -> str:
+        result = prompt()
+        self._frame.setdefault("dialogs", []).append(result)
+        return result
+
+    def sync(self, event: str, ready: bool, wait: typing.Callable[[], None]) -> bool:
+        if ready:
+            self._frame.setdefault("events", []).append(event)
+        return ready
+
+    def end_frame(self):
+        self._write(self._frame)
+
+    def close(self, frame_timer: FrameTimer):
+        self._file.close()
+        print(f"Recorded session to {self.path}")
+
+
+class InputPlayer(InputSession):
+    """Replays a file written by InputRecorder, frame for frame, then reports the frame times."""
+
+    def __init__(self, window, renderer: GlfwRenderer, path: Path):
+        super().__init__(window, renderer)
+        self.path = path
+
+        with path.open() as f:
+            try:
+                lines = [json.loads(line) for line in f if line.strip()]
+            except json.JSONDecodeError as e:
+                raise ValueError(f"Truncated or corrupt recording: {e}") from e
+
+        if not lines:
+            raise ValueError("empty recording")
+        if not isinstance(lines[0], dict):
+            raise ValueError("Truncated or corrupt recording: missing header")
+
+        self.header = lines[0]
+        if self.header.get("version") != _RECORDING_VERSION:
+            raise ValueError(f"Unsupported recording version: {self.header.get('version')}")
+
+        self.frames = lines[1:]
+        self._index = 0
+        self._dialogs: list[str] = []
+
+        # Keep the callbacks for replaying, then ignore the real keyboard
+        self._keyboard_callback = renderer.keyboard_callback
+        self._char_callback = renderer.char_callback
+        renderer.keyboard_callback = lambda *args: None
+        renderer.char_callback = lambda *args: None
+
+    @property
+    def frame_count(self) -> Optional[int]:
+        return len(self.frames)
+
+    @property
+    def throttled(self) -> bool:
+        return False
+
+    @property
+    def runs_background_jobs(self) -> bool:
+        return False
+
+    @property
+    def _frame(self) -> dict:
+        return self.frames[self._index]
+
+    def begin(self):
+        imgui.get_io().ini_file_name = None
+        glfw.set_window_size(self.window, *self.header["window_size"])
+
+        # Use the preferences from when it was recorded, and keep every other file in a directory of its own,
+        # without touching the real ones
+        data_directory = self.path.with_suffix(".replay")
+        data_directory.mkdir(exist_ok=True)
+        preferences.preferences_file_path = data_directory.joinpath("preferences.json")
+        global_preferences.clear()
+        global_preferences.update(self.header["preferences"])
+
+    def process_inputs(self):
+        frame = self._frame
+        io = imgui.get_io()
+
+        # Still processed for the framebuffer scale, but everything else is overwritten
+        self.renderer.process_inputs()
+        io.display_size = tuple(frame["size"])
+        io.delta_time = frame["dt"]
+        io.mouse_pos = tuple(frame["mouse"])
+        for i, down in enumerate(frame["buttons"]):
+            io.mouse_down[i] = down
+        io.mouse_wheel_horizontal, io.mouse_wheel = frame["wheel"]
+
+        for key, scancode, action, mods in frame.get("keys", []):
+            self._keyboard_callback(self.window, key, scancode, action, mods)
+        for char in frame.get("chars", []):
+            self._char_callback(self.window, char)
+
+        self._dialogs = list(frame.get("dialogs", []))
+
+    def content_scale(self) -> float:
+        return self._frame["scale"]
+
+    def prompt_file(self, prompt: typing.Callable[[], str]) -> str:
+        if self._dialogs:
+            return self._dialogs.pop(0)
+        return ""
+
+    def sync(self, event: str, ready: bool, wait: typing.Callable[[], None]) -> bool:
+        if event in self._frame.get("events", []):
+            wait()
+            return True
+        return False
+
+    def end_frame(self):
+        self._index += 1
+
+    def is_finished(self) -> bool:
+        return self._index >= len(self.frames)
+
+    def close(self, frame_timer: FrameTimer):
+        print(f"Replayed {self._index} frames from {self.path}")
+        print(f"{'section':<40} {'min ms':>10} {'avg ms':>10} {'p99 ms':>10}")
+        for name in [TOTAL_SECTION, *frame_timer.section_names]:
+            minimum, average, p99 = frame_timer.stats_for(name)
+            print(f"{name:<40} {minimum * 1000:>10.3f} {average * 1000:>10.3f} {p99 * 1000:>10.3f}")
+
+        csv_path = self.path.with_suffix(".timings.csv")
+        frame_timer.dump_csv(csv_path)
+        print(f"Saved all samples to {csv_path}")
@@ -0,0 +1,246 @@
+import math
+import typing
+
+import imgui
+
+# Limits for the render scale, which is how many pixels the display borders span on screen
+MIN_RENDER_SCALE = 50.0
+MAX_RENDER_SCALE = 50000.0
+
+# How much each step of the mouse wheel zooms the canvas
+ZOOM_STEP = 1.2
+
+# Below this render scale, actors close to each other are drawn as a single cluster
+CLUSTER_BELOW_RENDER_SCALE = 2000.0
+
+# Size of the screen cells actors are grouped in when clustering, in pixels
+CLUSTER_CELL_PIXELS = 24.0
+
+# The clusters are calculated for zoom levels this far apart, so zooming doesn't recalculate them every frame
+ZOOM_BUCKETS_PER_DOUBLING = 4
+
+# Camera outlines are simplified so no detail smaller than this many pixels is lost
+SIMPLIFY_TOLERANCE_PIXELS = 1.0
+
+# A cluster of actors: its average world position and how many actors are in it
+Cluster = tuple[float, float, int]
+
+# Left, top, right and bottom. For world coordinates, min x, min y, max x and max y
+Rect = tuple[float, float, float, float]
+
+
+def rects_intersect(a: Rect, b: Rect) -> bool:
+    return a[0] <= b[2] and b[0] <= a[2] and a[1] <= b[3] and b[1] <= a[3]
+
+
+def rect_contains(rect: Rect, x: float, y: float) -> bool:
+    return rect[0] <= x <= rect[2] and rect[1] <= y <= rect[3]
+
+
+def world_rect_of(boundings) -> Rect:
+    """Converts a `total_boundings` or `boundings` field of a collision entry to a Rect."""
+    x1, y1, x2, y2 = boundings
+    return min(x1, x2), min(y1, y2), max(x1, x2), max(y1, y2)
+
+
+class CanvasProjection:
+    """Maps world positions to screen positions in a level canvas, and back."""
+
+    def __init__(self, display_borders: dict[str, float], actual_scale: float, origin_x: float, origin_y: float):
+        left, right = display_borders["left"], display_borders["right"]
+        top, bottom = display_borders["top"], display_borders["bottom"]
+
+        # Pixels per world unit. Y is usually negative, since the canvas goes down from the top
+        self.scale_x = actual_scale / (right - left) if right != left else 0.0
+        self.scale_y = actual_scale / (bottom - top) if bottom != top else 0.0
+        self.offset_x = origin_x - left * self.scale_x
+        self.offset_y = origin_y - top * self.scale_y
+
+    @property
+    def key(self) -> tuple[float, float, float, float]:
+        """Equal for two projections that place everything at the same screen positions."""
+        return self.scale_x, self.scale_y, self.offset_x, self.offset_y
+
+    @property
+    def is_valid(self) -> bool:
+        return self.scale_x != 0 and self.scale_y != 0
+
+    def to_screen(self, x: float, y: float) -> tuple[float, float]:
+        return x * self.scale_x + self.offset_x, y * self.scale_y + self.offset_y
+
+    def to_world(self, x: float, y: float) -> tuple[float, float]:
+        return (x - self.offset_x) / self.scale_x, (y - self.offset_y) / self.scale_y
+
+    def world_rect(self, screen_rect: Rect) -> Rect:
+        """The part of the world visible inside the given screen rectangle."""
+        if not self.is_valid:
+            return -math.inf, -math.inf, math.inf, math.inf
+        x1, y1 = self.to_world(screen_rect[0], screen_rect[1])
+        x2, y2 = self.to_world(screen_rect[2], screen_rect[3])
+        return min(x1, x2), min(y1, y2), max(x1, x2), max(y1, y2)
+
+
+def zoom_bucket(scale: float) -> int:
+    return round(math.log2(abs(scale)) * ZOOM_BUCKETS_PER_DOUBLING)
+
+
+def cluster_cell_size(bucket: int) -> float:
+    """World size of a cluster cell, for the given zoom bucket."""
+    return CLUSTER_CELL_PIXELS / 2 ** (bucket / ZOOM_BUCKETS_PER_DOUBLING)
+
+
+def simplify_polyline(points: list[tuple[float, float]], tolerance: float) -> list[tuple[float, float]]:
+    """
+    Douglas-Peucker simplification: removes the points that are less than `tolerance` away from the segment
+    between the points that are kept. The first and last points are always kept.
+    """
+    if len(points) < 3 or tolerance <= 0:
+        return list(points)
+
+    keep = [False] * len(points)
+    keep[0] = keep[-1] = True
+    tolerance_sq = tolerance * tolerance
+    pending = [(0, len(points) - 1)]
+
+    while pending:
+        start, end = pending.pop()
+        start_x, start_y = points[start]
+        line_x, line_y = points[end][0] - start_x, points[end][1] - start_y
+        length_sq = line_x * line_x + line_y * line_y
+
+        farthest, farthest_sq = -1, tolerance_sq
+        for index in range(start + 1, end):
+            x, y = points[index][0] - start_x, points[index][1] - start_y
+            if length_sq != 0:
+                # Distance to the closest point of the segment. Outlines are closed, so points past the ends of
+                # the segment are common and must not be measured against the whole line
+                t = min(1.0, max(0.0, (x * line_x + y * line_y) / length_sq))
+                x, y = x - t * line_x, y - t * line_y
+            distance_sq = x * x + y * y
+            if distance_sq > farthest_sq:
+                farthest, farthest_sq = index, distance_sq
+
+        if farthest != -1:
+            keep[farthest] = True
+            pending.append((start, farthest))
+            pending.append((farthest, end))
+
+    return [point for point, kept in zip(points, keep) if kept]
+
+
+class CameraOutline:
+    """The outline of a collision camera, caching its simplified versions and its screen positions."""
+
+    def __init__(self, name: str, points: typing.Iterable[tuple[float, float]], rect: Rect):
+        self.name = name
+        self.points = list(points)
+        self.rect = rect
+        self._simplified: dict[int, list[tuple[float, float]]] = {}
+        self._screen_key: typing.Optional[tuple] = None
+        self._screen_points: list[tuple[float, float]] = []
+
+    def simplified(self, bucket: int) -> list[tuple[float, float]]:
+        """The outline without details smaller than a pixel, at the given zoom bucket."""
+        if bucket not in self._simplified:
+            tolerance = SIMPLIFY_TOLERANCE_PIXELS / 2 ** (bucket / ZOOM_BUCKETS_PER_DOUBLING)
+            self._simplified[bucket] = simplify_polyline(self.points, tolerance)
+        return self._simplified[bucket]
+
+    def screen_points(self, projection: CanvasProjection, simplify: bool) -> list[tuple[float, float]]:
+        key = (projection.key, simplify)
+        if self._screen_key != key:
+            points = self.points
+            if simplify:
+                points = self.simplified(zoom_bucket(max(abs(projection.scale_x), abs(projection.scale_y))))
+
+            scale_x, scale_y = projection.scale_x, projection.scale_y
+            offset_x, offset_y = projection.offset_x, projection.offset_y
+            self._screen_points = [(x * scale_x + offset_x, y * scale_y + offset_y) for x, y in points]
+            self._screen_key = key
+        return self._screen_points
+
+
+class CanvasInteraction:
+    """The actors under the mouse in a level canvas, and the one with its context popup open."""
+    POPUP_ID = "##canvas_actor_context"
+
+    def __init__(self):
+        self.hovered: list[tuple[str, str]] = []
+        self.hovered_keys: frozenset[tuple[str, str]] = frozenset()
+        self.context_actor: typing.Optional[tuple[str, str]] = None
+
+    def set_hovered(self, keys: list[tuple[str, str]]):
+        """Keeps the order for the tooltip, and a set for checking if an actor is hovered."""
+        self.hovered = keys
+        self.hovered_keys = frozenset(keys)
+
+    def open_context_popup(self, key: tuple[str, str]):
+        self.context_actor = key
+        imgui.open_popup(self.POPUP_ID)
+
+
+class LayerPositions:
+    """The names and world positions of the actors in one layer, as parallel lists."""
+
+    def __init__(self, entries: typing.Iterable[tuple[str, float, float]]):
+        self.names: list[str] = []
+        self.xs: list[float] = []
+        self.ys: list[float] = []
+        for name, x, y in entries:
+            self.names.append(name)
+            self.xs.append(x)
+            self.ys.append(y)
+        self.indices = {name: index for index, name in enumerate(self.names)}
+
+        self._clusters: dict[tuple[int, int], list[Cluster]] = {}
+        self._screen_key: typing.Optional[tuple] = None
+        self._screen_xs: list[float] = []
+        self._screen_ys: list[float] = []
+
+    def __len__(self):
+        return len(self.names)
+
+    def move(self, name: str, x: float, y: float):
+        """Changes the position of one actor, updating its screen position and dropping the clusters."""
+        index = self.indices[name]
+        self.xs[index] = x
+        self.ys[index] = y
+        if self._screen_key is not None:
+            scale_x, scale_y, offset_x, offset_y = self._screen_key
+            self._screen_xs[index] = x * scale_x + offset_x
+            self._screen_ys[index] = y * scale_y + offset_y
+        self._clusters.clear()
+
+    def screen_positions(self, projection: CanvasProjection) -> tuple[list[float], list[float]]:
+        """Positions of all actors in the screen, only recalculated when the projection changes."""
+        if self._screen_key != projection.key:
+            scale_x, scale_y = projection.scale_x, projection.scale_y
+            offset_x, offset_y = projection.offset_x, projection.offset_y
+            self._screen_xs = [x * scale_x + offset_x for x in self.xs]
+            self._screen_ys = [y * scale_y + offset_y for y in self.ys]
+            self._screen_key = projection.key
+        return self._screen_xs, self._screen_ys
+
+    def clusters(self, projection: CanvasProjection) -> list[Cluster]:
+        """
+        The actors grouped by screen cells at the projection's zoom. The cells are aligned to the world, so
+        panning doesn't change the clusters, and they're cached for each zoom bucket.
+        """
+        bucket = zoom_bucket(projection.scale_x), zoom_bucket(projection.scale_y)
+        if bucket not in self._clusters:
+            cell_width = cluster_cell_size(bucket[0])
+            cell_height = cluster_cell_size(bucket[1])
+
+            cells: dict[tuple[int, int], list[float]] = {}
+            for x, y in zip(self.xs, self.ys):
+                cell = math.floor(x / cell_width), math.floor(y / cell_height)
+                if (totals := cells.get(cell)) is None:
+                    cells[cell] = [x, y, 1]
+                else:
+                    totals[0] += x
+                    totals[1] += y
+                    totals[2] += 1
+
+            self._clusters[bucket] = [(x / count, y / count, int(count)) for x, y, count in cells.values()]
+
+        return self._clusters[bucket]
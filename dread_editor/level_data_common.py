@@ -1,14 +1,538 @@
+import colorsys
+import functools
+import hashlib
+import math
+import struct
 import typing
+
+import construct
 import imgui
 
+from dread_editor import level_canvas
+from dread_editor.actor_filter import ActorFilter
+from dread_editor.actor_groups import ActorGroupIndex
+from dread_editor.actor_index import ActorIndex
+from dread_editor.level_canvas import CameraOutline, CanvasInteraction, CanvasProjection, LayerPositions, Rect
+from dread_editor.preferences import global_preferences, save_preferences
+from dread_editor.spatial_index import SpatialGrid
 from dread_editor.type_render import SpecificTypeRender
 from dread_editor import imgui_util
+from mercury_engine_data_structures.formats import Bmscc
 from mercury_engine_data_structures.type_lib import BaseType
 
+ActorKey = tuple[str, str]
+
+# Radius of the actor circles in the canvas, in pixels
+ACTOR_RADIUS = 5
+
+# Radius of the circle for a cluster of many actors, in pixels
+MAX_CLUSTER_RADIUS = 12
+
+
+@functools.lru_cache()
+def color_for_layer(name: str) -> tuple[float, float, float, float]:
+    d = hashlib.blake2b(name.encode("utf-8"), digest_size=4).digest()
+    d = struct.unpack("=L", d)[0] / 0xFFFFFFFF
+    r, g, b = colorsys.hsv_to_rgb(d, 1, 1)
+    return r, g, b, 1
+
+
 class LevelData:
+    bmscc: Bmscc
+    valid_cameras: dict[str, bool]
+    display_borders: dict[str, float]
+    visible_actors: dict[ActorKey, bool]
+    canvas_interaction: CanvasInteraction
+    actor_filter: ActorFilter
+    actor_index: ActorIndex
+
+    # Increased whenever actors are added or removed, so anything derived from them knows it's outdated
+    generation: int = 0
+
+    # Offset of the canvas contents in pixels, changed by dragging the canvas
+    canvas_pan: tuple[float, float] = (0.0, 0.0)
+
+    # Set while zooming with the mouse wheel, so the preferences are saved once, when the wheel stops
+    _zoom_unsaved: bool = False
+
+    _layer_positions: typing.Optional[dict[str, LayerPositions]] = None
+    _layer_positions_generation: int = -1
+    _actor_rows: typing.Optional[dict[str, list[tuple[str, construct.Container]]]] = None
+    _actor_rows_key: typing.Optional[tuple] = None
+    _filter_candidates: typing.Optional[dict[str, list[str]]] = None
+    _camera_outlines: typing.Optional[list[CameraOutline]] = None
+    _actor_grid: typing.Optional[SpatialGrid[ActorKey]] = None
+    _actor_grid_key: typing.Optional[tuple] = None
+    _actor_groups: typing.Optional[ActorGroupIndex] = None
+
     def open_actor_link(self, link: str):
         raise NotImplementedError("Not implemented")
 
+    @property
+    def visible_layers(self) -> dict[str, bool]:
+        raise NotImplementedError("Not implemented")
+
+    @property
+    def render_scale(self) -> float:
+        raise NotImplementedError("Not implemented")
+
+    @render_scale.setter
+    def render_scale(self, value: float):
+        raise NotImplementedError("Not implemented")
+
+    def layer_names(self) -> typing.Iterable[str]:
+        raise NotImplementedError("Not implemented")
+
+    def actors_in_layer(self, layer_name: str) -> dict[str, construct.Container]:
+        raise NotImplementedError("Not implemented")
+
+    def find_actor(self, key: ActorKey) -> typing.Optional[construct.Container]:
+        """The actor with the given (layer name, actor name), if it still exists."""
+        raise NotImplementedError("Not implemented")
+
+    def render_actor_context_menu(self, layer_name: str, actor_name: str, actor: construct.Container):
+        raise NotImplementedError("Not implemented")
+
+    def actor_position(self, actor: construct.Container) -> typing.Optional[tuple[float, float]]:
+        """The world position of the actor, if it has one."""
+        raise NotImplementedError("Not implemented")
+
+    def actor_positions_by_layer(self) -> typing.Iterator[tuple[str, typing.Iterator[tuple[str, float, float]]]]:
+        """For each layer, its name and the name and world position of each of its actors."""
+        raise NotImplementedError("Not implemented")
+
+    def build_actor_groups(self) -> ActorGroupIndex:
+        raise NotImplementedError("Not implemented")
+
+    def actor_group_member(self, layer_name: str, actor_name: str) -> typing.Hashable:
+        """How the actor groups of this level refer to the given actor."""
+        raise NotImplementedError("Not implemented")
+
+    def add_actor_to_group(self, group_name: str, layer_name: str, actor_name: str):
+        raise NotImplementedError("Not implemented")
+
+    def remove_actor_from_group(self, group_name: str, layer_name: str, actor_name: str):
+        raise NotImplementedError("Not implemented")
+
+    def mark_modified(self):
+        self.generation += 1
+
+    def actor_added(self, key: ActorKey):
+        """Call after adding the given actor. Everything derived from the actors of the level is rebuilt."""
+        self.actor_index.update(key, self.find_actor(key))
+        self.mark_modified()
+
+    def actor_modified(self, key: ActorKey):
+        """Call after editing the given actor. Only the entries of that actor are updated."""
+        actor = self.find_actor(key)
+        self.actor_index.update(key, actor)
+        if not self.actor_filter.is_empty:
+            # The edit might change if the actor passes the filter
+            self._actor_rows = None
+
+        if self._layer_positions is None or self._layer_positions_generation != self.generation:
+            return
+
+        layer_name, actor_name = key
+        positions = self._layer_positions.get(layer_name)
+        position = self.actor_position(actor) if actor is not None else None
+        if positions is None or actor_name not in positions.indices or position is None:
+            if position is not None or (positions is not None and actor_name in positions.indices):
+                # Gained or lost its position, so the layer has different actors
+                self.mark_modified()
+            return
+
+        index = positions.indices[actor_name]
+        old_x, old_y = positions.xs[index], positions.ys[index]
+        if (old_x, old_y) != position:
+            positions.move(actor_name, *position)
+            if self._actor_grid is not None:
+                self._actor_grid.move(key, old_x, old_y, *position)
+
+    def build_actor_index(self) -> ActorIndex:
+        return ActorIndex.build(self.actor_filter, (
+            ((layer_name, actor_name), actor)
+            for layer_name in self.layer_names()
+            for actor_name, actor in self.actors_in_layer(layer_name).items()
+        ))
+
+    def actor_groups(self) -> ActorGroupIndex:
+        """Built on first use, then kept up to date by `add_actor_to_group` and `remove_actor_from_group`."""
+        if self._actor_groups is None:
+            self._actor_groups = self.build_actor_groups()
+        return self._actor_groups
+
+    def render_actor_groups(self, layer_name: str, actor_name: str):
+        """A checkbox for each actor group, only drawing the ones visible in the current window."""
+        groups = self.actor_groups()
+        groups_of_actor = groups.groups_of(self.actor_group_member(layer_name, actor_name))
+
+        for i in imgui_util.clipped_rows(len(groups.names)):
+            group_name = groups.names[i]
+            changed, present = imgui.checkbox(f"{group_name} ##actor_group.{group_name}",
+                                              group_name in groups_of_actor)
+            if changed:
+                if present:
+                    self.add_actor_to_group(group_name, layer_name, actor_name)
+                else:
+                    self.remove_actor_from_group(group_name, layer_name, actor_name)
+
+    def shows_actor_details(self) -> bool:
+        """
+        If the actor window being drawn should show all fields of the actor. With the `focused_actor_details`
+        preference, only the focused window does, so having many actors open stays cheap.
+        """
+        return (not global_preferences.get("focused_actor_details", False)
+                or imgui.is_window_focused(imgui.FOCUS_ROOT_AND_CHILD_WINDOWS))
+
+    def render_actor_summary(self, actor: construct.Container):
+        imgui.text_disabled("Focus this window to see all fields.")
+        imgui.text(f"Actordef: {self.actor_filter.actordef_of(actor)}")
+        imgui.text(f"Components: {', '.join(self.actor_filter.components_of(actor))}")
+
+    def actor_rows(self, layer_name: str) -> list[tuple[str, construct.Container]]:
+        """
+        The name and actor of each actor in the layer that passes the filter, sorted by name.
+        Cached until the actors or the filter change.
+        """
+        key = (self.generation, self.actor_filter.cache_key)
+        if self._actor_rows is None or self._actor_rows_key != key:
+            self._actor_rows = {}
+            self._actor_rows_key = key
+            self._filter_candidates = None
+
+        if layer_name not in self._actor_rows:
+            actors = self.actors_in_layer(layer_name)
+            if self.actor_filter.is_empty:
+                rows = list(actors.items())
+            else:
+                if self._filter_candidates is None:
+                    # The index narrows it down to the few actors that can match, for all layers at once
+                    self._filter_candidates = {}
+                    for candidate_layer, actor_name in self.actor_index.candidates():
+                        self._filter_candidates.setdefault(candidate_layer, []).append(actor_name)
+
+                rows = [
+                    (actor_name, actors[actor_name])
+                    for actor_name in self._filter_candidates.get(layer_name, [])
+                    if actor_name in actors and self.actor_filter.passes(actor_name, actors[actor_name])
+                ]
+            self._actor_rows[layer_name] = sorted(rows, key=lambda it: it[0])
+        return self._actor_rows[layer_name]
+
+    def render_actor_layers(self, current_scale: float) -> set[ActorKey]:
+        """
+        Draws the tree of layers, with a checkbox to open each actor that passes the filter.
+        Only the rows in view are drawn. Returns the actors whose rows are hovered.
+        """
+        highlighted_actors_in_list = set()
+        highlighted_actors_in_canvas = self.canvas_interaction.hovered_keys
+
+        self.actor_filter.draw(current_scale)
+        imgui.columns(2, "actor layers")
+        imgui.set_column_width(-1, 20 * current_scale)
+        for layer_name in self.layer_names():
+            changed, self.visible_layers[layer_name] = imgui.checkbox(f"##{layer_name}_visible",
+                                                                      self.visible_layers[layer_name])
+            if changed:
+                save_preferences()
+
+            imgui.next_column()
+            if imgui_util.colored_tree_node(layer_name, color_for_layer(layer_name)):
+                rows = self.actor_rows(layer_name)
+
+                for index in imgui_util.clipped_rows(len(rows)):
+                    actor_name, actor = rows[index]
+                    key = (layer_name, actor_name)
+                    label = f"{actor_name} ##{layer_name}_{actor_name}"
+
+                    if key in highlighted_actors_in_canvas:
+                        with imgui.colored(imgui.COLOR_TEXT, 1, 1, 0.2):
+                            changed, visible = imgui.checkbox(label, self.visible_actors.get(key, False))
+                    else:
+                        changed, visible = imgui.checkbox(label, self.visible_actors.get(key, False))
+                    if changed:
+                        self.visible_actors[key] = visible
+
+                    if imgui.is_item_hovered():
+                        highlighted_actors_in_list.add(key)
+
+                    if imgui.begin_popup_context_item():
+                        self.render_actor_context_menu(layer_name, actor_name, actor)
+                        imgui.end_popup()
+
+                imgui.tree_pop()
+            imgui.next_column()
+        imgui.columns(1, "actor layers")
+
+        return highlighted_actors_in_list
+
+    def layer_positions(self) -> dict[str, LayerPositions]:
+        """Positions of the actors of every layer, rebuilt only when actors change."""
+        if self._layer_positions is None or self._layer_positions_generation != self.generation:
+            self._layer_positions = {
+                layer_name: LayerPositions(entries)
+                for layer_name, entries in self.actor_positions_by_layer()
+            }
+            self._layer_positions_generation = self.generation
+        return self._layer_positions
+
+    def visible_layer_positions(self) -> typing.Iterator[tuple[str, LayerPositions]]:
+        for layer_name, positions in self.layer_positions().items():
+            if self.visible_layers.get(layer_name):
+                yield layer_name, positions
+
+    def actor_grid(self) -> SpatialGrid[ActorKey]:
+        """Spatial index of the visible actors, rebuilt only when actors or the visible layers change."""
+        key = (self.generation, frozenset(name for name, visible in self.visible_layers.items() if visible))
+        if self._actor_grid is None or self._actor_grid_key != key:
+            self._actor_grid = SpatialGrid(
+                ((layer_name, name), x, y)
+                for layer_name, positions in self.visible_layer_positions()
+                for name, x, y in zip(positions.names, positions.xs, positions.ys)
+            )
+            self._actor_grid_key = key
+        return self._actor_grid
+
+    def actors_at_canvas_position(self, mouse, projection: CanvasProjection) -> list[ActorKey]:
+        """The visible actors whose circle in the canvas contains the given screen position."""
+        if not projection.is_valid:
+            return []
+
+        world_x, world_y = projection.to_world(mouse.x, mouse.y)
+        radius_x = ACTOR_RADIUS / abs(projection.scale_x)
+        radius_y = ACTOR_RADIUS / abs(projection.scale_y)
+
+        result = []
+        for key, x, y in self.actor_grid().query_rect(world_x - radius_x, world_y - radius_y,
+                                                      world_x + radius_x, world_y + radius_y):
+            distance_x = (x - world_x) * projection.scale_x
+            distance_y = (y - world_y) * projection.scale_y
+            if distance_x ** 2 + distance_y ** 2 < ACTOR_RADIUS * ACTOR_RADIUS:
+                result.append(key)
+        return result
+
+    def render_canvas_controls(self):
+        changed, new_scale = imgui.slider_float("Scale", self.render_scale,
+                                                level_canvas.MIN_RENDER_SCALE, level_canvas.MAX_RENDER_SCALE,
+                                                flags=imgui.SLIDER_FLAGS_LOGARITHMIC)
+        if changed:
+            self.render_scale = new_scale
+        if imgui.is_item_deactivated_after_edit():
+            save_preferences()
+
+        imgui.same_line()
+        if imgui.button("Reset view"):
+            self.canvas_pan = (0.0, 0.0)
+            self.render_scale = 500.0
+            save_preferences()
+        imgui_util.set_hovered_tooltip("Drag the level to move around, and use the mouse wheel to zoom.")
+
+        imgui.same_line()
+        changed, cluster_actors = imgui.checkbox("Cluster actors", global_preferences.get("cluster_actors", False))
+        if changed:
+            global_preferences["cluster_actors"] = cluster_actors
+            save_preferences()
+        imgui_util.set_hovered_tooltip("When zoomed out, actors of a layer that are close to each other are drawn "
+                                       "as a single circle with how many actors it has.")
+
+        imgui.same_line()
+        changed, simplify_cameras = imgui.checkbox("Simplify cameras", global_preferences.get("simplify_cameras", True))
+        if changed:
+            global_preferences["simplify_cameras"] = simplify_cameras
+            save_preferences()
+        imgui_util.set_hovered_tooltip("Skip the points of camera outlines that wouldn't be visible at this zoom.")
+
+        self.display_borders["left"], self.display_borders["right"] = imgui.slider_float2(
+            "Left and right borders",
+            self.display_borders["left"],
+            self.display_borders["right"],
+            -59999,
+            59999,
+        )[1]
+        self.display_borders["top"], self.display_borders["bottom"] = imgui.slider_float2(
+            "Top and bottom borders",
+            self.display_borders["top"],
+            self.display_borders["bottom"],
+            59999,
+            -59999,
+        )[1]
+
+    def update_canvas_view(self, current_scale: float) -> tuple[CanvasProjection, Rect]:
+        """
+        Uses the rest of the current window as the canvas, where dragging pans and the mouse wheel zooms.
+        Returns the projection for this frame and the canvas rectangle on screen.
+        """
+        canvas_po = imgui.get_cursor_screen_pos()
+        width, height = imgui.get_content_region_available()
+        width, height = max(width, 1), max(height, 1)
+        imgui.invisible_button("##canvas_area", width, height,
+                               imgui.BUTTON_MOUSE_BUTTON_LEFT | imgui.BUTTON_MOUSE_BUTTON_MIDDLE)
+        io = imgui.get_io()
+
+        if imgui.is_item_active() and (imgui.is_mouse_dragging(0) or imgui.is_mouse_dragging(2)):
+            self.canvas_pan = (self.canvas_pan[0] + io.mouse_delta.x, self.canvas_pan[1] + io.mouse_delta.y)
+
+        def make_projection():
+            return CanvasProjection(self.display_borders, self.render_scale * current_scale,
+                                    canvas_po.x + self.canvas_pan[0], canvas_po.y + self.canvas_pan[1])
+
+        projection = make_projection()
+        if imgui.is_item_hovered() and io.mouse_wheel != 0 and projection.is_valid:
+            # Keep the point under the mouse in place
+            mouse = imgui.get_mouse_pos()
+            world_x, world_y = projection.to_world(mouse.x, mouse.y)
+            self.render_scale = min(max(self.render_scale * level_canvas.ZOOM_STEP ** io.mouse_wheel,
+                                        level_canvas.MIN_RENDER_SCALE), level_canvas.MAX_RENDER_SCALE)
+            projection = make_projection()
+            new_x, new_y = projection.to_screen(world_x, world_y)
+            self.canvas_pan = (self.canvas_pan[0] + mouse.x - new_x, self.canvas_pan[1] + mouse.y - new_y)
+            projection = make_projection()
+            self._zoom_unsaved = True
+
+        elif self._zoom_unsaved:
+            save_preferences()
+            self._zoom_unsaved = False
+
+        return projection, (canvas_po.x, canvas_po.y, canvas_po.x + width, canvas_po.y + height)
+
+    def camera_outlines(self) -> list[CameraOutline]:
+        if self._camera_outlines is None:
+            self._camera_outlines = [
+                CameraOutline(entry.name, ((v.x, v.y) for v in entry.data.polys[0].points),
+                              level_canvas.world_rect_of(entry.data.total_boundings))
+                for entry in self.bmscc.raw.layers[0].entries
+            ]
+        return self._camera_outlines
+
+    def draw_canvas_cameras(self, draw_list, projection: CanvasProjection, canvas_rect: Rect,
+                            highlighted_section: typing.Optional[str]):
+        """Draws the outline of each selected camera that's inside the canvas."""
+        if not projection.is_valid:
+            return
+
+        world_rect = projection.world_rect(canvas_rect)
+        simplify = global_preferences.get("simplify_cameras", True)
+        color = imgui.get_color_u32_rgba(0.2, 0.2, 1, 0.8)
+        highlighted_color = imgui.get_color_u32_rgba(0.2, 0.8, 1, 1.0)
+
+        for outline in self.camera_outlines():
+            if not self.valid_cameras.get(outline.name):
+                continue
+            if not level_canvas.rects_intersect(world_rect, outline.rect):
+                continue
+
+            if highlighted_section == outline.name:
+                draw_list.add_polyline(outline.screen_points(projection, simplify), highlighted_color,
+                                       flags=imgui.DRAW_CLOSED,
+                                       thickness=5)
+            else:
+                draw_list.add_polyline(outline.screen_points(projection, simplify), color,
+                                       flags=imgui.DRAW_CLOSED,
+                                       thickness=3)
+
+    def draw_canvas_actors(self, draw_list, projection: CanvasProjection, canvas_rect: Rect,
+                           highlighted_actors: set[ActorKey]):
+        """
+        Draws a circle for each visible actor inside the canvas, with the highlighted ones drawn bigger and
+        on top. When zoomed in, only the actors in view are looked at.
+        """
+        if not projection.is_valid:
+            return
+
+        add_circle_filled = draw_list.add_circle_filled
+        margin = MAX_CLUSTER_RADIUS if self.clusters_actors else ACTOR_RADIUS
+        world_rect = projection.world_rect((canvas_rect[0] - margin, canvas_rect[1] - margin,
+                                            canvas_rect[2] + margin, canvas_rect[3] + margin))
+        grid = self.actor_grid()
+
+        if self.clusters_actors:
+            self._draw_canvas_clusters(draw_list, projection, world_rect)
+
+        elif grid.is_inside(*world_rect):
+            for layer_name, positions in self.visible_layer_positions():
+                color = imgui.get_color_u32_rgba(*color_for_layer(layer_name))
+                for x, y in zip(*positions.screen_positions(projection)):
+                    add_circle_filled(x, y, ACTOR_RADIUS, color)
+        else:
+            colors = {
+                layer_name: imgui.get_color_u32_rgba(*color_for_layer(layer_name))
+                for layer_name, _ in self.visible_layer_positions()
+            }
+            scale_x, scale_y = projection.scale_x, projection.scale_y
+            offset_x, offset_y = projection.offset_x, projection.offset_y
+            for (layer_name, _), x, y in grid.query_rect(*world_rect):
+                add_circle_filled(x * scale_x + offset_x, y * scale_y + offset_y, ACTOR_RADIUS, colors[layer_name])
+
+        white = imgui.get_color_u32_rgba(1, 1, 1, 1)
+        for layer_name, actor_name in highlighted_actors:
+            positions = self.layer_positions().get(layer_name)
+            if positions is None or not self.visible_layers.get(layer_name) or actor_name not in positions.indices:
+                continue
+            index = positions.indices[actor_name]
+            add_circle_filled(*projection.to_screen(positions.xs[index], positions.ys[index]), 15, white)
+
+    def render_canvas_interaction(self):
+        """
+        Shows the tooltip for the actors under the mouse and handles clicking them. Double click opens their
+        windows, and right click on a single actor opens its context popup.
+        """
+        interaction = self.canvas_interaction
+
+        if interaction.hovered:
+            imgui.begin_tooltip()
+            for key in interaction.hovered:
+                imgui.text(f"{key[0]} - {key[1]}")
+                if imgui.is_mouse_double_clicked(0):
+                    self.visible_actors[key] = True
+            imgui.end_tooltip()
+
+            if len(interaction.hovered) == 1 and imgui.is_mouse_released(1):
+                interaction.open_context_popup(interaction.hovered[0])
+
+        if interaction.context_actor is None:
+            return
+
+        if imgui.begin_popup(interaction.POPUP_ID,
+                             imgui.WINDOW_ALWAYS_AUTO_RESIZE | imgui.WINDOW_NO_TITLE_BAR |
+                             imgui.WINDOW_NO_SAVED_SETTINGS):
+            actor = self.find_actor(interaction.context_actor)
+            if actor is not None:
+                self.render_actor_context_menu(*interaction.context_actor, actor)
+            else:
+                imgui.close_current_popup()
+            imgui.end_popup()
+        else:
+            interaction.context_actor = None
+
+    @property
+    def clusters_actors(self) -> bool:
+        """If actors should be drawn as clusters, which happens when zoomed out."""
+        return (global_preferences.get("cluster_actors", False)
+                and self.render_scale < level_canvas.CLUSTER_BELOW_RENDER_SCALE)
+
+    def _draw_canvas_clusters(self, draw_list, projection: CanvasProjection, world_rect: Rect):
+        min_x, min_y, max_x, max_y = world_rect
+        scale_x, scale_y = projection.scale_x, projection.scale_y
+        offset_x, offset_y = projection.offset_x, projection.offset_y
+        text_color = imgui.get_color_u32_rgba(0, 0, 0, 1)
+
+        for layer_name, positions in self.visible_layer_positions():
+            color = imgui.get_color_u32_rgba(*color_for_layer(layer_name))
+            for x, y, count in positions.clusters(projection):
+                if not (min_x <= x <= max_x and min_y <= y <= max_y):
+                    continue
+
+                screen_x, screen_y = x * scale_x + offset_x, y * scale_y + offset_y
+                if count == 1:
+                    draw_list.add_circle_filled(screen_x, screen_y, ACTOR_RADIUS, color)
+                else:
+                    radius = min(ACTOR_RADIUS + 2 * math.log2(count), MAX_CLUSTER_RADIUS)
+                    draw_list.add_circle_filled(screen_x, screen_y, radius, color)
+                    text = str(count)
+                    text_width, text_height = imgui.calc_text_size(text)
+                    draw_list.add_text(screen_x - text_width / 2, screen_y - text_height / 2, text_color, text)
+
 
 class GameLinkRender(SpecificTypeRender):
     def __init__(self, level_data: LevelData):
@@ -1,8 +1,5 @@
-import colorsys
 import copy
-import hashlib
 import os
-import struct
 import typing
 
 import imgui
@@ -14,8 +11,10 @@ from mercury_engine_data_structures.type_lib import BaseType
 
 from dread_editor import imgui_util
 from dread_editor.actor_filter import ActorFilter
+from dread_editor.actor_groups import ActorGroupIndex, actor_key_of_link
+from dread_editor.level_canvas import CanvasInteraction, rect_contains
 from dread_editor.level_data_common import GameLinkRender, LevelData
-from dread_editor.preferences import global_preferences, save_preferences
+from dread_editor.preferences import global_preferences
 from dread_editor.type_render import TypeTreeRender, SpecificTypeRender
 
 
@@ -46,7 +45,7 @@ class LevelDataDread(LevelData):
         self.visible_actors = {}
         self.valid_cameras = valid_cameras
         self.display_borders = display_borders
-        self.highlighted_actors_in_canvas = []
+        self.canvas_interaction = CanvasInteraction()
         self.actor_filter = ActorFilter()
         self.copy_actor_name = ""
         self.type_lib = get_type_lib_dread()
@@ -61,6 +60,8 @@ class LevelDataDread(LevelData):
             if layer_name not in self.visible_layers:
                 self.visible_layers[layer_name] = True
 
+        self.actor_index = self.build_actor_index()
+
     @classmethod
     def open_file(cls, pkg_editor: FileTreeEditor, file_name: str):
         brfld = typing.cast(Brfld, pkg_editor.get_parsed_asset(file_name))
@@ -95,8 +96,8 @@ class LevelDataDread(LevelData):
 
     @render_scale.setter
     def render_scale(self, value):
+        # Only saved once the zoom ends, see `update_canvas_view`
         self.preferences["render_scale"] = value
-        save_preferences()
 
     def open_actor_link(self, link: str):
         if (actor := self.brfld.follow_link(link)) is not None:
@@ -104,9 +105,21 @@ class LevelDataDread(LevelData):
             print(actor)
             self.visible_actors[(layer_name, actor.sName)] = True
 
-    def render_actor_context_menu(self, layer_name: str, actor):
+    def layer_names(self):
+        return self.brfld.raw.Root.pScenario.rEntitiesLayer.dctSublayers.keys()
+
+    def actors_in_layer(self, layer_name: str):
+        return self.brfld.actors_for_layer(layer_name)
+
+    def find_actor(self, key: tuple[str, str]):
+        layer_name, actor_name = key
+        if layer_name not in self.brfld.raw.Root.pScenario.rEntitiesLayer.dctSublayers:
+            return None
+        return self.brfld.actors_for_layer(layer_name).get(actor_name)
+
+    def render_actor_context_menu(self, layer_name: str, actor_name: str, actor):
         if self.copy_actor_name is None:
-            self.copy_actor_name = f"{actor.sName}_Copy"
+            self.copy_actor_name = f"{actor_name}_Copy"
 
         if imgui.button("Duplicate Actor"):
             new_actor = copy.deepcopy(actor)
@@ -131,11 +144,46 @@ class LevelDataDread(LevelData):
                                           self.display_borders["top"], self.display_borders["bottom"])
         if changed_x or changed_y:
             actor.vPos = (x, y, actor.vPos[2])
+            self.actor_modified((layer_name, actor_name))
 
     def add_new_actor(self, layer_name: str, actor):
         if actor is not None:
             self.brfld.actors_for_layer(layer_name)[actor.sName] = actor
             self.visible_actors[(layer_name, actor.sName)] = True
+            self.actor_added((layer_name, actor.sName))
+
+    def build_actor_groups(self) -> ActorGroupIndex[tuple[str, str]]:
+        return ActorGroupIndex(self.brfld.all_actor_groups(), (
+            (group_name, key)
+            for group_name in self.brfld.all_actor_groups()
+            for link in self.brfld.get_actor_group(group_name)
+            if (key := actor_key_of_link(link)) is not None
+        ))
+
+    def actor_group_member(self, layer_name: str, actor_name: str):
+        return layer_name, actor_name
+
+    def add_actor_to_group(self, group_name: str, layer_name: str, actor_name: str):
+        self.brfld.add_actor_to_group(group_name, actor_name, layer_name)
+        self.actor_groups().add(group_name, (layer_name, actor_name))
+
+    def remove_actor_from_group(self, group_name: str, layer_name: str, actor_name: str):
+        self.brfld.remove_actor_from_group(group_name, actor_name, layer_name)
+        self.actor_groups().remove(group_name, (layer_name, actor_name))
+
+    def actor_position(self, actor):
+        if "vPos" not in actor:
+            return None
+        return actor.vPos[0], actor.vPos[1]
+
+    def actor_positions_by_layer(self):
+        for layer_name in self.brfld.all_layers():
+            # TODO: vPos might be a required field. Re-visit after editor fields
+            yield layer_name, (
+                (actor_name, actor.vPos[0], actor.vPos[1])
+                for actor_name, actor in self.brfld.actors_for_layer(layer_name).items()
+                if "vPos" in actor
+            )
 
     def render_window(self, current_scale):
         imgui.set_next_window_size(900 * current_scale, 300 * current_scale, imgui.FIRST_USE_EVER)
@@ -145,57 +193,11 @@ class LevelDataDread(LevelData):
             imgui.end()
             return False
 
-        def color_for_layer(name: str):
-            d = hashlib.blake2b(name.encode("utf-8"), digest_size=4).digest()
-            d = struct.unpack("=L", d)[0] / 0xFFFFFFFF
-            r, g, b = colorsys.hsv_to_rgb(d, 1, 1)
-            return [r, g, b, 1]
-
-        highlighted_actors_in_list = set()
-
         with imgui_util.with_group():
             imgui.text("Actor Layers")
             with imgui_util.with_child("##ActorLayers", 300 * current_scale, 0,
                                        imgui.WINDOW_ALWAYS_VERTICAL_SCROLLBAR):
-                self.actor_filter.draw(current_scale)
-                imgui.columns(2, "actor layers")
-                imgui.set_column_width(-1, 20 * current_scale)
-                for layer_name in self.brfld.raw.Root.pScenario.rEntitiesLayer.dctSublayers:
-                    changed, self.visible_layers[layer_name] = imgui.checkbox(f"##{layer_name}_visible",
-                                                                              self.visible_layers[layer_name])
-                    if changed:
-                        save_preferences()
-
-                    imgui.next_column()
-                    if imgui_util.colored_tree_node(layer_name, color_for_layer(layer_name)):
-                        actors = self.brfld.actors_for_layer(layer_name)
-
-                        for actor_name, actor in sorted(actors.items(), key=lambda it: it[0]):
-                            key = (layer_name, actor_name)
-                            if not self.actor_filter.passes(actor):
-                                continue
-
-                            def do_item():
-                                self.visible_actors[key] = imgui.checkbox(
-                                    f"{actor_name} ##{layer_name}_{actor_name}", self.visible_actors.get(key)
-                                )[1]
-
-                            if (layer_name, actor) in self.highlighted_actors_in_canvas:
-                                with imgui.colored(imgui.COLOR_TEXT, 1, 1, 0.2):
-                                    do_item()
-                            else:
-                                do_item()
-
-                            if imgui.is_item_hovered():
-                                highlighted_actors_in_list.add(key)
-
-                            if imgui.begin_popup_context_item():
-                                self.render_actor_context_menu(layer_name, actor)
-                                imgui.end_popup()
-
-                        imgui.tree_pop()
-                    imgui.next_column()
-                imgui.columns(1, "actor layers")
+                highlighted_actors_in_list = self.render_actor_layers(current_scale)
 
         imgui.same_line()
 
@@ -211,103 +213,26 @@ class LevelDataDread(LevelData):
 
         imgui.same_line()
 
-        with imgui_util.with_child("##Canvas", 0, 0):
-            changed, new_scale = imgui.slider_float("Scale", self.render_scale, 100, 1000)
-            if changed:
-                self.render_scale = new_scale
-
-            self.display_borders["left"], self.display_borders["right"] = imgui.slider_float2(
-                "Left and right borders",
-                self.display_borders["left"],
-                self.display_borders["right"],
-                -59999,
-                59999,
-            )[1]
-            self.display_borders["top"], self.display_borders["bottom"] = imgui.slider_float2(
-                "Top and bottom borders",
-                self.display_borders["top"],
-                self.display_borders["bottom"],
-                59999,
-                -59999,
-            )[1]
-
+        with imgui_util.with_child("##Canvas", 0, 0, imgui.WINDOW_NO_SCROLLBAR | imgui.WINDOW_NO_SCROLL_WITH_MOUSE):
+            self.render_canvas_controls()
             imgui.separator()
 
             mouse = imgui.get_mouse_pos()
-            canvas_po = imgui.get_cursor_screen_pos()
-            actual_scale = self.render_scale * current_scale
+            projection, canvas_rect = self.update_canvas_view(current_scale)
             draw_list = imgui.get_window_draw_list()
+            draw_list.push_clip_rect(*canvas_rect, True)
+
+            self.draw_canvas_cameras(draw_list, projection, canvas_rect, highlighted_section)
 
-            def lerp_x(x):
-                lx = (x - self.display_borders["left"]) / (
-                        self.display_borders["right"] - self.display_borders["left"])
-                return lx * actual_scale + canvas_po.x
-
-            def lerp_y(y):
-                ly = (y - self.display_borders["top"]) / (
-                        self.display_borders["bottom"] - self.display_borders["top"])
-                return ly * actual_scale + canvas_po.y
-
-            for entry in self.bmscc.raw.layers[0].entries:
-                if not self.valid_cameras.get(entry.name):
-                    continue
-
-                raw_vertices = [
-                    (lerp_x(v.x), lerp_y(v.y))
-                    for v in entry.data.polys[0].points
-                ]
-                if highlighted_section == entry.name:
-                    draw_list.add_polyline(raw_vertices, imgui.get_color_u32_rgba(0.2, 0.8, 1, 1.0),
-                                           flags=imgui.DRAW_CLOSED,
-                                           thickness=5)
-                else:
-                    draw_list.add_polyline(raw_vertices, imgui.get_color_u32_rgba(0.2, 0.2, 1, 0.8),
-                                           flags=imgui.DRAW_CLOSED,
-                                           thickness=3)
-
-            self.highlighted_actors_in_canvas = []
-
-            for layer_name in self.brfld.all_layers():
-                if not self.visible_layers[layer_name]:
-                    continue
-
-                color = imgui.get_color_u32_rgba(*color_for_layer(layer_name))
-                for actor in self.brfld.actors_for_layer(layer_name).values():
-                    if "vPos" not in actor:
-                        # TODO: vPos might be a required field. Re-visit after editor fields
-                        continue
-
-                    final_x = lerp_x(actor.vPos[0])
-                    final_y = lerp_y(actor.vPos[1])
-                    if (layer_name, actor.sName) in highlighted_actors_in_list:
-                        draw_list.add_circle_filled(final_x, final_y, 15, imgui.get_color_u32_rgba(1, 1, 1, 1))
-                    else:
-                        draw_list.add_circle_filled(final_x, final_y, 5, color)
-
-                    if (mouse.x - final_x) ** 2 + (mouse.y - final_y) ** 2 < 5 * 5:
-                        self.highlighted_actors_in_canvas.append((layer_name, actor))
-
-            if self.highlighted_actors_in_canvas and imgui.is_window_hovered():
-                imgui.begin_tooltip()
-                for layer_name, actor in self.highlighted_actors_in_canvas:
-                    imgui.text(f"{layer_name} - {actor.sName}")
-                    if imgui.is_mouse_double_clicked(0):
-                        self.visible_actors[(layer_name, actor.sName)] = True
-                imgui.end_tooltip()
-
-                if len(self.highlighted_actors_in_canvas) == 1:
-                    layer_name, actor = self.highlighted_actors_in_canvas[0]
-                    if imgui.is_mouse_released(1):
-                        print("OPEN THE POPUP!", f"canvas_actor_context_{layer_name}_{actor.sName}")
-                        imgui.open_popup(f"canvas_actor_context_{layer_name}_{actor.sName}")
-
-            for layer_name in self.brfld.all_layers():
-                for actor in list(self.brfld.actors_for_layer(layer_name).values()):
-                    if imgui.begin_popup(f"canvas_actor_context_{layer_name}_{actor.sName}",
-                                         imgui.WINDOW_ALWAYS_AUTO_RESIZE | imgui.WINDOW_NO_TITLE_BAR |
-                                         imgui.WINDOW_NO_SAVED_SETTINGS):
-                        self.render_actor_context_menu(layer_name, actor)
-                        imgui.end_popup()
+            if imgui.is_window_hovered() and rect_contains(canvas_rect, mouse.x, mouse.y):
+                self.canvas_interaction.set_hovered(self.actors_at_canvas_position(mouse, projection))
+            else:
+                self.canvas_interaction.set_hovered([])
+
+            self.draw_canvas_actors(draw_list, projection, canvas_rect, highlighted_actors_in_list)
+            draw_list.pop_clip_rect()
+
+            self.render_canvas_interaction()
 
         imgui.end()
         return True
@@ -319,18 +244,29 @@ class LevelDataDread(LevelData):
 
             imgui.set_next_window_size(300 * current_scale, 200 * current_scale, imgui.FIRST_USE_EVER)
             path = f"{self.file_name}_{layer_name}_{actor_name}"
-            active = imgui.begin(f"Actor: {layer_name} - {actor_name} ##{path}", active)[1]
+            expanded, active = imgui.begin(f"Actor: {layer_name} - {actor_name} ##{path}", active)
             if not active:
                 self.visible_actors[(layer_name, actor_name)] = False
                 imgui.end()
                 continue
 
+            if not expanded:
+                imgui.end()
+                continue
+
             actor = self.brfld.actors_for_layer(layer_name)[actor_name]
+            if not self.shows_actor_details():
+                self.render_actor_summary(actor)
+                imgui.end()
+                continue
+
             imgui.columns(2, "actor details")
-            self.tree_render.render_value_of_type(
-                actor, self.type_lib.get_type(actor["@type"]),
+            changed = self.tree_render.render_value_of_type(
+                actor, self.tree_render.metadata.get_type(actor["@type"]),
                 f"{self.file_name}.{layer_name}.{actor_name}",
-            )
+            )[0]
+            if changed:
+                self.actor_modified((layer_name, actor_name))
             imgui.columns(1, "actor details")
 
             imgui.separator()
@@ -338,14 +274,7 @@ class LevelDataDread(LevelData):
 
             with imgui_util.with_child("##ActorGroups", 0, 300 * current_scale,
                                        imgui.WINDOW_ALWAYS_VERTICAL_SCROLLBAR):
-                for group_name in sorted(self.brfld.all_actor_groups()):
-                    changed, present = imgui.checkbox(f"{group_name} ##actor_group.{group_name}",
-                                                      self.brfld.is_actor_in_group(group_name, actor_name, layer_name))
-                    if changed:
-                        if present:
-                            self.brfld.add_actor_to_group(group_name, actor_name, layer_name)
-                        else:
-                            self.brfld.remove_actor_from_group(group_name, actor_name, layer_name)
+                self.render_actor_groups(layer_name, actor_name)
 
             imgui.end()
 
@@ -376,7 +305,7 @@ class InnerValueRender(SpecificTypeRender):
 
         result = value
         changed, new_actor = self.level_data.tree_render.render_value_of_type(
-            self.cache[path], self.level_data.type_lib.get_type("CActor"),
+            self.cache[path], self.level_data.tree_render.metadata.get_type("CActor"),
             f"{path}.actor",
         )
         if changed:
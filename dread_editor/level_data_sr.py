@@ -1,8 +1,5 @@
-import colorsys
 import copy
-import hashlib
 import os
-import struct
 import typing
 
 import imgui
@@ -13,8 +10,10 @@ from mercury_engine_data_structures.type_lib import BaseType, get_type_lib_samus
 
 from dread_editor import imgui_util
 from dread_editor.actor_filter import ActorFilter
+from dread_editor.actor_groups import ActorGroupIndex
+from dread_editor.level_canvas import CanvasInteraction, rect_contains
 from dread_editor.level_data_common import GameLinkRender, LevelData
-from dread_editor.preferences import global_preferences, save_preferences
+from dread_editor.preferences import global_preferences
 from dread_editor.type_render import TypeTreeRender, SpecificTypeRender
 
 
@@ -29,6 +28,14 @@ def get_subareas(pkg_editor: FileTreeEditor, bmsld_path: str) -> set[str]:
     return cams
 
 
+def sr_components(actor) -> typing.Iterable[str]:
+    return (component.component_type for component in actor.get("components", ()))
+
+
+def sr_actordef(actor) -> str:
+    return actor.get("type", "")
+
+
 class LevelDataSR(LevelData):
     def __init__(self, file_name: str, bmsld: Bmsld, bmscc: Bmscc, valid_cameras: dict[str, bool],
                  display_borders: dict[str, float]):
@@ -43,8 +50,8 @@ class LevelDataSR(LevelData):
         self.visible_actors = {}
         self.valid_cameras = valid_cameras
         self.display_borders = display_borders
-        self.highlighted_actors_in_canvas = []
-        self.actor_filter = ActorFilter()
+        self.canvas_interaction = CanvasInteraction()
+        self.actor_filter = ActorFilter(sr_components, sr_actordef)
         self.copy_actor_name = ""
         self.type_lib = get_type_lib_samus_returns()
 
@@ -58,6 +65,8 @@ class LevelDataSR(LevelData):
             if layer_index not in self.visible_layers:
                 self.visible_layers[str(layer_index)] = True
 
+        self.actor_index = self.build_actor_index()
+
     @classmethod
     def open_file(cls, pkg_editor: FileTreeEditor, file_name: str):
         bmsld = typing.cast(Bmsld, pkg_editor.get_parsed_asset(file_name))
@@ -92,21 +101,31 @@ class LevelDataSR(LevelData):
 
     @render_scale.setter
     def render_scale(self, value):
+        # Only saved once the zoom ends, see `update_canvas_view`
         self.preferences["render_scale"] = value
-        save_preferences()
 
     def open_actor_link(self, link: str):
         if (actor := self.bmsld.follow_link(link)) is not None:
             layer_name = link.split(":")[4]
             self.visible_actors[(layer_name, actor.sName)] = True
 
-    def render_actor_context_menu(self, layer_index: int, actor):
+    def layer_names(self):
+        return [str(layer_index) for layer_index in range(len(self.bmsld.raw.actors))]
+
+    def actors_in_layer(self, layer_name: str):
+        return self.bmsld.raw.actors[int(layer_name)]
+
+    def find_actor(self, key: tuple[str, str]):
+        layer_name, actor_name = key
+        return self.bmsld.raw.actors[int(layer_name)].get(actor_name)
+
+    def render_actor_context_menu(self, layer_name: str, actor_name: str, actor):
         if self.copy_actor_name is None:
-            self.copy_actor_name = f"{actor.sName}_Copy"
+            self.copy_actor_name = f"{actor_name}_Copy"
 
         if imgui.button("Duplicate Actor"):
             new_actor = copy.deepcopy(actor)
-            self.add_new_actor(layer_index, new_actor, self.copy_actor_name)
+            self.add_new_actor(int(layer_name), new_actor, self.copy_actor_name)
             imgui.close_current_popup()
             self.copy_actor_name = None
 
@@ -119,18 +138,53 @@ class LevelDataSR(LevelData):
 
         imgui.text("Position:")
         imgui.same_line()
-        changed_x, x = imgui.slider_float("##actor-context-position-x", actor.positon[0],
+        changed_x, x = imgui.slider_float("##actor-context-position-x", actor.position[0],
                                           self.display_borders["left"], self.display_borders["right"])
         imgui.same_line()
-        changed_y, y = imgui.slider_float("##actor-context-position-y", actor.positon[1],
+        changed_y, y = imgui.slider_float("##actor-context-position-y", actor.position[1],
                                           self.display_borders["top"], self.display_borders["bottom"])
         if changed_x or changed_y:
-            actor.positon = (x, y, actor.positon[2])
+            actor.position = (x, y, actor.position[2])
+            self.actor_modified((layer_name, actor_name))
 
     def add_new_actor(self, layer_index: int, actor, actor_name: str):
         if actor is not None:
             self.bmsld.raw.actors[layer_index][actor_name] = actor
             self.visible_actors[(str(layer_index), actor_name)] = True
+            self.actor_added((str(layer_index), actor_name))
+
+    def build_actor_groups(self) -> ActorGroupIndex[str]:
+        groups = list(self.bmsld.all_actor_groups())
+        return ActorGroupIndex((group_name for group_name, _ in groups), (
+            (group_name, actor_name)
+            for group_name, group in groups
+            for actor_name in group.names
+        ))
+
+    def actor_group_member(self, layer_name: str, actor_name: str):
+        # Actor names are unique in the whole level, so groups don't need the layer
+        return actor_name
+
+    def add_actor_to_group(self, group_name: str, layer_name: str, actor_name: str):
+        self.bmsld.insert_into_entity_group(self.bmsld.get_actor_group(group_name), actor_name)
+        self.actor_groups().add(group_name, actor_name)
+
+    def remove_actor_from_group(self, group_name: str, layer_name: str, actor_name: str):
+        self.bmsld.remove_actor_from_group(group_name, actor_name)
+        self.actor_groups().remove(group_name, actor_name)
+
+    def actor_position(self, actor):
+        if "position" not in actor:
+            return None
+        return actor.position[0], actor.position[1]
+
+    def actor_positions_by_layer(self):
+        for layer_index, actors in enumerate(self.bmsld.raw.actors):
+            yield str(layer_index), (
+                (actor_name, actor.position[0], actor.position[1])
+                for actor_name, actor in actors.items()
+                if "position" in actor
+            )
 
     def render_window(self, current_scale):
         imgui.set_next_window_size(900 * current_scale, 300 * current_scale, imgui.FIRST_USE_EVER)
@@ -140,58 +194,11 @@ class LevelDataSR(LevelData):
             imgui.end()
             return False
 
-        def color_for_layer(name: str):
-            d = hashlib.blake2b(name.encode("utf-8"), digest_size=4).digest()
-            d = struct.unpack("=L", d)[0] / 0xFFFFFFFF
-            r, g, b = colorsys.hsv_to_rgb(d, 1, 1)
-            return [r, g, b, 1]
-
-        highlighted_actors_in_list = set()
-
         with imgui_util.with_group():
             imgui.text("Actor Layers")
             with imgui_util.with_child("##ActorLayers", 300 * current_scale, 0,
                                        imgui.WINDOW_ALWAYS_VERTICAL_SCROLLBAR):
-                self.actor_filter.draw(current_scale)
-                imgui.columns(2, "actor layers")
-                imgui.set_column_width(-1, 20 * current_scale)
-                for layer_index in range(len(self.bmsld.raw.actors)):
-                    layer_name = str(layer_index)
-                    changed, self.visible_layers[layer_name] = imgui.checkbox(f"##{layer_name}_visible",
-                                                                              self.visible_layers[layer_name])
-                    if changed:
-                        save_preferences()
-
-                    imgui.next_column()
-                    if imgui_util.colored_tree_node(layer_name, color_for_layer(layer_name)):
-                        actors = self.bmsld.raw.actors[int(layer_name)]
-
-                        for actor_name, actor in sorted(actors.items(), key=lambda it: it[0]):
-                            key = (layer_name, actor_name)
-                            if not self.actor_filter.passes(actor):
-                                continue
-
-                            def do_item():
-                                self.visible_actors[key] = imgui.checkbox(
-                                    f"{actor_name} ##{layer_name}_{actor_name}", self.visible_actors.get(key)
-                                )[1]
-
-                            if (layer_name, actor) in self.highlighted_actors_in_canvas:
-                                with imgui.colored(imgui.COLOR_TEXT, 1, 1, 0.2):
-                                    do_item()
-                            else:
-                                do_item()
-
-                            if imgui.is_item_hovered():
-                                highlighted_actors_in_list.add(key)
-
-                            if imgui.begin_popup_context_item():
-                                self.render_actor_context_menu(layer_index, actor)
-                                imgui.end_popup()
-
-                        imgui.tree_pop()
-                    imgui.next_column()
-                imgui.columns(1, "actor layers")
+                highlighted_actors_in_list = self.render_actor_layers(current_scale)
 
         imgui.same_line()
 
@@ -207,106 +214,26 @@ class LevelDataSR(LevelData):
 
         imgui.same_line()
 
-        with imgui_util.with_child("##Canvas", 0, 0):
-            changed, new_scale = imgui.slider_float("Scale", self.render_scale, 100, 1000)
-            if changed:
-                self.render_scale = new_scale
-
-            self.display_borders["left"], self.display_borders["right"] = imgui.slider_float2(
-                "Left and right borders",
-                self.display_borders["left"],
-                self.display_borders["right"],
-                -59999,
-                59999,
-            )[1]
-            self.display_borders["top"], self.display_borders["bottom"] = imgui.slider_float2(
-                "Top and bottom borders",
-                self.display_borders["top"],
-                self.display_borders["bottom"],
-                59999,
-                -59999,
-            )[1]
-
+        with imgui_util.with_child("##Canvas", 0, 0, imgui.WINDOW_NO_SCROLLBAR | imgui.WINDOW_NO_SCROLL_WITH_MOUSE):
+            self.render_canvas_controls()
             imgui.separator()
 
             mouse = imgui.get_mouse_pos()
-            canvas_po = imgui.get_cursor_screen_pos()
-            actual_scale = self.render_scale * current_scale
+            projection, canvas_rect = self.update_canvas_view(current_scale)
             draw_list = imgui.get_window_draw_list()
+            draw_list.push_clip_rect(*canvas_rect, True)
+
+            self.draw_canvas_cameras(draw_list, projection, canvas_rect, highlighted_section)
+
+            if imgui.is_window_hovered() and rect_contains(canvas_rect, mouse.x, mouse.y):
+                self.canvas_interaction.set_hovered(self.actors_at_canvas_position(mouse, projection))
+            else:
+                self.canvas_interaction.set_hovered([])
 
-            def lerp_x(x):
-                lx = (x - self.display_borders["left"]) / (
-                        self.display_borders["right"] - self.display_borders["left"])
-                return lx * actual_scale + canvas_po.x
-
-            def lerp_y(y):
-                ly = (y - self.display_borders["top"]) / (
-                        self.display_borders["bottom"] - self.display_borders["top"])
-                return ly * actual_scale + canvas_po.y
-
-            for entry in self.bmscc.raw.layers[0].entries:
-                if not self.valid_cameras.get(entry.name):
-                    continue
-
-                raw_vertices = [
-                    (lerp_x(v.x), lerp_y(v.y))
-                    for v in entry.data.polys[0].points
-                ]
-                if highlighted_section == entry.name:
-                    draw_list.add_polyline(raw_vertices, imgui.get_color_u32_rgba(0.2, 0.8, 1, 1.0),
-                                           flags=imgui.DRAW_CLOSED,
-                                           thickness=5)
-                else:
-                    draw_list.add_polyline(raw_vertices, imgui.get_color_u32_rgba(0.2, 0.2, 1, 0.8),
-                                           flags=imgui.DRAW_CLOSED,
-                                           thickness=3)
-
-            self.highlighted_actors_in_canvas = []
-
-            for layer_index in range(len(self.bmsld.raw.actors)):
-                layer_name = str(layer_index)
-                if not self.visible_layers[layer_name]:
-                    continue
-
-                color = imgui.get_color_u32_rgba(*color_for_layer(layer_name))
-                for actor_name in self.bmsld.raw.actors[layer_index]:
-                    actor = self.bmsld.raw.actors[layer_index][actor_name]
-                    if "position" not in actor:
-                        # TODO: vPos might be a required field. Re-visit after editor fields
-                        continue
-
-                    final_x = lerp_x(actor.position[0])
-                    final_y = lerp_y(actor.position[1])
-                    if (layer_name, actor_name) in highlighted_actors_in_list:
-                        draw_list.add_circle_filled(final_x, final_y, 15, imgui.get_color_u32_rgba(1, 1, 1, 1))
-                    else:
-                        draw_list.add_circle_filled(final_x, final_y, 5, color)
-
-                    if (mouse.x - final_x) ** 2 + (mouse.y - final_y) ** 2 < 5 * 5:
-                        self.highlighted_actors_in_canvas.append((layer_name, actor_name))
-
-            if self.highlighted_actors_in_canvas and imgui.is_window_hovered():
-                imgui.begin_tooltip()
-                for layer_name, actor_name in self.highlighted_actors_in_canvas:
-                    imgui.text(f"{layer_name} - {actor_name}")
-                    if imgui.is_mouse_double_clicked(0):
-                        self.visible_actors[(layer_name, actor_name)] = True
-                imgui.end_tooltip()
-
-                if len(self.highlighted_actors_in_canvas) == 1:
-                    layer_name, actor_name = self.highlighted_actors_in_canvas[0]
-                    if imgui.is_mouse_released(1):
-                        print("OPEN THE POPUP!", f"canvas_actor_context_{layer_name}_{actor_name}")
-                        imgui.open_popup(f"canvas_actor_context_{layer_name}_{actor_name}")
-
-            # for sub_areas in self.bmsld.raw.sub_areas:
-            #     layer_name = sub_areas.name
-            #     for actor in list(self.bmsld.actors_for_layer(layer_name).values()):
-            #         if imgui.begin_popup(f"canvas_actor_context_{layer_name}_{actor.sName}",
-            #                              imgui.WINDOW_ALWAYS_AUTO_RESIZE | imgui.WINDOW_NO_TITLE_BAR |
-            #                              imgui.WINDOW_NO_SAVED_SETTINGS):
-            #             self.render_actor_context_menu(layer_name, actor)
-            #             imgui.end_popup()
+            self.draw_canvas_actors(draw_list, projection, canvas_rect, highlighted_actors_in_list)
+            draw_list.pop_clip_rect()
+
+            self.render_canvas_interaction()
 
         imgui.end()
         return True
@@ -318,18 +245,29 @@ class LevelDataSR(LevelData):
 
             imgui.set_next_window_size(300 * current_scale, 200 * current_scale, imgui.FIRST_USE_EVER)
             path = f"{self.file_name}_{layer_name}_{actor_name}"
-            active = imgui.begin(f"Actor: {layer_name} - {actor_name} ##{path}", active)[1]
+            expanded, active = imgui.begin(f"Actor: {layer_name} - {actor_name} ##{path}", active)
             if not active:
                 self.visible_actors[(layer_name, actor_name)] = False
                 imgui.end()
                 continue
 
+            if not expanded:
+                imgui.end()
+                continue
+
             actor = self.bmsld.raw.actors[int(layer_name)][actor_name]
+            if not self.shows_actor_details():
+                self.render_actor_summary(actor)
+                imgui.end()
+                continue
+
             imgui.columns(2, "actor details")
-            self.tree_render.render_value_of_type(
-                actor, self.type_lib.get_type("ProperActor"),
+            changed = self.tree_render.render_value_of_type(
+                actor, self.tree_render.metadata.get_type("ProperActor"),
                 f"{self.file_name}.{layer_name}.{actor_name}",
-            )
+            )[0]
+            if changed:
+                self.actor_modified((layer_name, actor_name))
             imgui.columns(1, "actor details")
 
             imgui.separator()
@@ -337,14 +275,7 @@ class LevelDataSR(LevelData):
 
             with imgui_util.with_child("##ActorGroups", 0, 300 * current_scale,
                                        imgui.WINDOW_ALWAYS_VERTICAL_SCROLLBAR):
-                for group_name, group in sorted(self.bmsld.all_actor_groups()):
-                    changed, present = imgui.checkbox(f"{group_name} ##actor_group.{group_name}",
-                                                      self.bmsld.is_actor_in_group(group_name, actor_name))
-                    # if changed:
-                    #     if present:
-                    #         self.bmsld.add_actor_to_group(group_name, actor_name, layer_name)
-                    #     else:
-                    #         self.bmsld.remove_actor_from_group(group_name, actor_name, layer_name)
+                self.render_actor_groups(layer_name, actor_name)
 
             imgui.end()
 
@@ -373,7 +304,7 @@ class InnerValueRenderSR(SpecificTypeRender):
 
         result = value
         changed, new_actor = self.level_data.tree_render.render_value_of_type(
-            self.cache[path], self.level_data.type_lib.get_type("ProperActor"),
+            self.cache[path], self.level_data.tree_render.metadata.get_type("ProperActor"),
             f"{path}.actor",
         )
         if changed:
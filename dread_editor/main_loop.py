@@ -1,3 +1,5 @@
+import argparse
+import concurrent.futures
 import logging
 import tkinter
 import tkinter.filedialog
@@ -13,19 +15,23 @@ from mercury_engine_data_structures.file_tree_editor import FileTreeEditor, Outp
 from mercury_engine_data_structures.type_lib import BaseType
 
 from dread_editor import type_render, imgui_util
+from dread_editor.actor_database import ActorDatabase
+from dread_editor.actor_search import ActorSearch, ActorRecord, make_worker_pool
+from dread_editor.asset_catalogue import AssetCatalogue
 from dread_editor.file_browser import FileBrowser
 from dread_editor.file_editor import FileEditor
+from dread_editor.frame_profiler import FrameProfiler
+from dread_editor.frame_throttle import FrameThrottle
+from dread_editor.frame_timer import FrameTimer
+from dread_editor.input_recording import InputPlayer, InputRecorder, InputSession
 from dread_editor.level_data_common import LevelData
 from dread_editor.level_data_dread import LevelDataDread
 from dread_editor.level_data_sr import LevelDataSR
+from dread_editor import preferences
 from dread_editor.preferences import global_preferences, load_preferences, save_preferences
+from dread_editor.romfs_loader import RomfsLoader
 from dread_editor.type_render import SpecificTypeRender, TypeTreeRender
 
-PathsByDirectory = dict[str, typing.Union[str, "PathsByDirectory"]]
-
-all_bmsad_actordefs: list[str] = []
-nested_all_files: PathsByDirectory = {}
-
 glfw_window = None
 
 
@@ -72,69 +78,45 @@ def impl_glfw_init():
 
 
 current_level_data: Optional[LevelData] = None
+current_actor_database: Optional[ActorDatabase] = None
+
+
+def references_tooltip(records: list[ActorRecord]) -> str:
+    levels = {record.level for record in records}
+    return f"Used by {len(records)} actors in {len(levels)} levels"
 
 
 class AssetLinkRender(SpecificTypeRender):
+    def __init__(self, catalogue: AssetCatalogue):
+        self.catalogue = catalogue
+
     def uses_one_column(self, type_data: BaseType):
         return True
 
     def create_default(self, type_data: BaseType):
-        return all_bmsad_actordefs[0]
+        return self.catalogue.actordefs[0]
 
     def render_value(self, value: typing.Any, type_data: BaseType, path: str):
         if path.endswith(".oActorDefLink"):
-            result = imgui_util.combo_str(f"##{path}", value, all_bmsad_actordefs)
+            result = imgui_util.combo_str(f"##{path}", value, self.catalogue.actordefs)
 
             if imgui.begin_popup_context_item(f"{path}_context"):
                 if imgui.menu_item("Copy text")[0]:
                     glfw.set_clipboard_string(glfw_window, value)
                 imgui.end_popup()
-            else:
-                imgui_util.set_hovered_tooltip(value)
+            elif imgui.is_item_hovered():
+                tooltip = value
+                if current_actor_database is not None:
+                    tooltip += "\n" + references_tooltip(current_actor_database.actors_using_actordef(value))
+                imgui.set_tooltip(tooltip)
 
             return result
         else:
             return type_render.render_string(value, path)
 
 
-def add_custom_type_renders(tree_render: TypeTreeRender):
-    tree_render.specific_renders["base::core::CAssetLink"] = AssetLinkRender()
-
-
-def clean_single_item_directory(directory: PathsByDirectory) -> PathsByDirectory:
-    if isinstance(directory, str):
-        return directory
-
-    result = {}
-    for key, value in directory.items():
-        if isinstance(value, str):
-            result[key] = value
-        elif len(value) > 1:
-            result[key] = clean_single_item_directory(value)
-        else:
-            # the way split_directories works, they're never empty
-            assert len(value) > 0
-            nested_key, nested_value = list(value.items())[0]
-            result[f"{key}/{nested_key}"] = clean_single_item_directory(nested_value)
-
-    return result
-
-
-def split_directories(files: list[str]) -> PathsByDirectory:
-    result = {}
-
-    for item in files:
-        parent = result
-        for part in item.split("/"):
-            assert len(part) > 0
-            if part not in parent:
-                if part.endswith(".bmsad"):
-                    parent[part] = item
-                else:
-                    parent[part] = {}
-            parent = parent[part]
-
-    return clean_single_item_directory(result)
+def add_custom_type_renders(tree_render: TypeTreeRender, catalogue: AssetCatalogue):
+    tree_render.specific_renders["base::core::CAssetLink"] = AssetLinkRender(catalogue)
 
 
 def save_editors(open_editors: dict[str, FileEditor], pkg_editor: FileTreeEditor):
@@ -147,65 +129,186 @@ def save_editors(open_editors: dict[str, FileEditor], pkg_editor: FileTreeEditor
 def draw_open_editors(current_scale: float, open_editors: dict[str, FileEditor]):
     items = typing.cast(list[tuple[str, FileEditor]], list(open_editors.items()))
     for path, editor in items:
-        active = imgui.begin(path, True)[1]
+        expanded, active = imgui.begin(path, True)
         if not active:
             open_editors.pop(path)
             imgui.end()
             continue
 
+        if not expanded:
+            imgui.end()
+            continue
+
         editor.draw(current_scale)
         imgui.end()
 
 
-def loop():
+def loop(record_path: Optional[Path] = None, replay_path: Optional[Path] = None):
     imgui.create_context()
     window = impl_glfw_init()
     impl = GlfwRenderer(window)
+    throttle = FrameThrottle(window, impl)
+
+    if record_path is not None:
+        session = InputRecorder(window, impl, record_path)
+    elif replay_path is not None:
+        session = InputPlayer(window, impl, replay_path)
+    else:
+        session = InputSession(window, impl)
+
+    frame_timer = FrameTimer(session.frame_count or 300)
 
     global current_level_data, glfw_window
 
     open_editors: dict[str, FileEditor] = {}
     glfw_window = window
     load_preferences()
+    session.begin()
+    # Only after the session begins, since replays use a data directory of their own
+    frame_profiler = FrameProfiler(preferences.data_directory())
 
     file_browser: Optional[FileBrowser] = None
+    actor_search: Optional[ActorSearch] = None
+    # Shared by the global search and the actor index of the current root
+    worker_pool: Optional[concurrent.futures.ProcessPoolExecutor] = None
     pkg_editor: Optional[FileTreeEditor] = None
+    asset_catalogue: Optional[AssetCatalogue] = None
     current_error_message = None
     current_game = None
     pending_load_last_romfs = True
     # brfld (dread) or bmsld (samus returns)
     possible_level_files = []
 
-    def load_romfs(path: Path):
-        nonlocal pkg_editor, possible_level_files, file_browser
-        pkg_editor = FileTreeEditor(path, current_game)
-        level_file_name = "bmsld" if current_game == Game.SAMUS_RETURNS else "brfld"
-        possible_level_files = [
-            asset_name
-            for asset_name in pkg_editor.all_asset_names()
-            if asset_name.endswith(level_file_name)
-        ]
-        possible_level_files.sort()
-        all_bmsad = [
-            asset_name
-            for asset_name in pkg_editor.all_asset_names()
-            if asset_name.endswith("bmsad")
-        ]
-        all_bmsad.sort()
-
-        all_bmsad_actordefs.clear()
-        all_bmsad_actordefs.extend(f"actordef:{asset_name}" for asset_name in all_bmsad)
-
-        file_browser = FileBrowser(pkg_editor, current_game)
-
-        global_preferences["last_romfs"] = str(path)
-        global_preferences["last_game"] = current_game.value
+    romfs_loader: Optional[RomfsLoader] = None
+    # Level picked from the menu while the pkgs were still being read
+    pending_level_file: Optional[str] = None
+    # If the current load fails, forget the romfs saved in the preferences
+    forget_romfs_on_error = False
+
+    def load_romfs(path: Path, game: Game, forget_on_error: bool = False):
+        nonlocal romfs_loader, forget_romfs_on_error
+        if romfs_loader is not None:
+            romfs_loader.cancel()
+        forget_romfs_on_error = forget_on_error
+        romfs_loader = RomfsLoader(path, game)
+        romfs_loader.start()
+
+    def open_level_file(name: str):
+        global current_level_data
+        if current_game == Game.SAMUS_RETURNS:
+            current_level_data = LevelDataSR.open_file(pkg_editor, name)
+        else:
+            current_level_data = LevelDataDread.open_file(pkg_editor, name)
+        add_custom_type_renders(current_level_data.tree_render, asset_catalogue)
+
+    def open_search_result(record: ActorRecord):
+        if current_level_data is None or current_level_data.file_name != record.level:
+            open_level_file(record.level)
+        current_level_data.visible_actors[(record.layer, record.name)] = True
+
+    def stop_background_jobs():
+        """Stops the global search and the actor index, without waiting for the levels being parsed."""
+        nonlocal actor_search, worker_pool
+        global current_actor_database
+
+        if actor_search is not None:
+            actor_search.close()
+            actor_search = None
+        if current_actor_database is not None:
+            current_actor_database.close()
+            current_actor_database = None
+        if worker_pool is not None:
+            # Also cancels the queued levels, so exiting doesn't wait for them
+            worker_pool.shutdown(wait=False, cancel_futures=True)
+            worker_pool = None
+
+    def install_catalogue(loader: RomfsLoader):
+        """
+        Makes the level list and file browser usable, even if the pkgs are still being read.
+        Replaces everything of the previous root, so while one is loaded it's only called once the new load succeeds.
+        """
+        nonlocal pkg_editor, asset_catalogue, possible_level_files, file_browser, current_game, pending_level_file
+        global current_level_data
+
+        current_level_data = None
+        stop_background_jobs()
+        current_game = loader.game
+        pkg_editor = None
+        pending_level_file = None
+        asset_catalogue = loader.catalogue
+        possible_level_files = asset_catalogue.with_extension(
+            ".bmsld" if current_game == Game.SAMUS_RETURNS else ".brfld"
+        )
+        file_browser = FileBrowser(None, asset_catalogue, current_game)
+
+    def finish_load_romfs():
+        nonlocal romfs_loader, pkg_editor, asset_catalogue, possible_level_files, file_browser, pending_level_file
+        nonlocal current_error_message, actor_search, worker_pool
+        global current_actor_database
+
+        loader, romfs_loader = romfs_loader, None
+        if loader.is_cancelled() or loader.error is not None:
+            if pkg_editor is None and asset_catalogue is not None:
+                # A catalogue of this or an earlier load was already in use, but there's no editor to go with it
+                asset_catalogue = None
+                possible_level_files = []
+                file_browser = None
+                pending_level_file = None
+
+            if loader.error is not None:
+                if forget_romfs_on_error:
+                    global_preferences["last_romfs"] = None
+                    global_preferences["last_game"] = None
+                    save_preferences()
+                else:
+                    current_error_message = f"Unable to load {loader.path}: {loader.error}"
+            return
+
+        if asset_catalogue is not loader.catalogue:
+            install_catalogue(loader)
+
+        pkg_editor = loader.pkg_editor
+        file_browser.tree_editor = pkg_editor
+        if session.runs_background_jobs:
+            worker_pool = make_worker_pool(loader.path, loader.game)
+            actor_search = ActorSearch(worker_pool, loader.game, possible_level_files)
+            current_actor_database = ActorDatabase(worker_pool, loader.path, loader.game, possible_level_files,
+                                                   asset_catalogue, loader.fingerprint)
+            current_actor_database.start()
+        file_browser.actor_database = current_actor_database
+        if actor_search is not None:
+            actor_search.actor_database = current_actor_database
+
+        global_preferences["last_romfs"] = str(loader.path)
+        global_preferences["last_game"] = loader.game.value
         save_preferences()
 
-    while not glfw.window_should_close(window):
-        glfw.poll_events()
-        impl.process_inputs()
-        current_scale = glfw.get_window_content_scale(window)[0]
+        if pending_level_file is not None:
+            open_level_file(pending_level_file)
+            pending_level_file = None
+
+    busy = True
+    while not glfw.window_should_close(window) and not session.is_finished():
+        if session.throttled:
+            throttle.wait_for_next_frame(busy)
+        else:
+            glfw.poll_events()
+        frame_timer.begin_frame()
+        frame_profiler.begin_frame()
+        session.process_inputs()
+
+        if romfs_loader is not None:
+            # Only early when nothing is loaded, so a cancelled or failed load keeps the previous root usable
+            if (pkg_editor is None and asset_catalogue is not romfs_loader.catalogue
+                    and not romfs_loader.is_cancelled()
+                    and session.sync("romfs_catalogue", romfs_loader.catalogue is not None,
+                                     romfs_loader.wait_for_catalogue)
+                    and romfs_loader.catalogue is not None):
+                install_catalogue(romfs_loader)
+            if session.sync("romfs_done", romfs_loader.is_done(), romfs_loader.wait):
+                finish_load_romfs()
+
+        current_scale = session.content_scale()
         imgui.get_io().font_global_scale = current_scale
 
         imgui.new_frame()
@@ -221,17 +324,13 @@ def loop():
         if imgui.begin_main_menu_bar():
             if imgui.begin_menu("File", True):
                 if imgui.menu_item("Select extracted Metroid Dread root")[0]:
-                    f = prompt_file(directory=True)
+                    f = session.prompt_file(lambda: prompt_file(directory=True))
                     if f:
-                        current_level_data = None
-                        current_game = Game.DREAD
-                        load_romfs(Path(f))
+                        load_romfs(Path(f), Game.DREAD)
                 if imgui.menu_item("Select extracted Samus Returns root")[0]:
-                    f = prompt_file(directory=True)
+                    f = session.prompt_file(lambda: prompt_file(directory=True))
                     if f:
-                        current_level_data = None
-                        current_game = Game.SAMUS_RETURNS
-                        load_romfs(Path(f))
+                        load_romfs(Path(f), Game.SAMUS_RETURNS)
 
                 imgui.text_disabled(f'* Current root: {global_preferences.get("last_romfs")}')
 
@@ -240,6 +339,11 @@ def loop():
                 else:
                     file_browser.menu_item()
 
+                if actor_search is None:
+                    imgui.text_disabled('Search actors in all levels')
+                else:
+                    actor_search.menu_item()
+
                 imgui.separator()
 
                 if imgui.menu_item("Save changes")[0]:
@@ -250,60 +354,158 @@ def loop():
                             current_level_data.apply_changes_to(pkg_editor)
                         save_editors(open_editors, pkg_editor)
 
-                        f = prompt_file(directory=True)
+                        f = session.prompt_file(lambda: prompt_file(directory=True))
                         if f:
                             pkg_editor.save_modifications(Path(f), OutputFormat.PKG, finalize_editor=False)
 
                 imgui.end_menu()
 
+            if imgui.begin_menu("Settings", True):
+                changed, global_preferences["idle_mode"] = imgui.menu_item(
+                    "Sleep while idle", "", throttle.idle_mode,
+                )
+                if changed:
+                    save_preferences()
+
+                changed, global_preferences["frame_cap"] = imgui.slider_int(
+                    "Frame cap", throttle.frame_cap, 0, 240, "%d fps" if throttle.frame_cap > 0 else "Unlimited",
+                )
+                if imgui.is_item_deactivated_after_edit():
+                    save_preferences()
+
+                changed, global_preferences["focused_actor_details"] = imgui.menu_item(
+                    "Only show all fields of the focused actor", "",
+                    global_preferences.get("focused_actor_details", False),
+                )
+                if changed:
+                    save_preferences()
+
+                changed, global_preferences["show_demo_window"] = imgui.menu_item(
+                    "Show ImGui demo window", "", global_preferences.get("show_demo_window", False),
+                )
+                if changed:
+                    save_preferences()
+
+                imgui.end_menu()
+
+            if imgui.begin_menu("Debug", True):
+                frame_timer.menu_item()
+                imgui.separator()
+                frame_profiler.menu_items()
+                imgui.end_menu()
+
             if imgui.begin_menu("Select level file", len(possible_level_files) > 0):
-                current_file_name = None
+                current_file_name = pending_level_file
                 if current_level_data is not None:
                     current_file_name = current_level_data.file_name
 
+                actor_counts = {}
+                if current_actor_database is not None:
+                    actor_counts = current_actor_database.actor_counts_by_level()
+
                 for name in possible_level_files:
-                    if imgui.menu_item(name, "", name == current_file_name)[0]:
-                        current_level_data = LevelDataSR.open_file(pkg_editor, name) if current_game == Game.SAMUS_RETURNS else LevelDataDread.open_file(pkg_editor, name)
-                        add_custom_type_renders(current_level_data.tree_render)
+                    actor_count = f"{actor_counts[name]} actors" if name in actor_counts else ""
+                    if imgui.menu_item(name, actor_count, name == current_file_name)[0]:
+                        if pkg_editor is None:
+                            pending_level_file = name
+                        else:
+                            open_level_file(name)
 
                 imgui.end_menu()
 
+            if romfs_loader is not None and romfs_loader.is_cancelled():
+                # The loader only stops between steps, so this can take a while
+                imgui.text_disabled(f"Cancelling the load of {romfs_loader.path}...")
+
+            elif romfs_loader is not None:
+                imgui.text_disabled(f"Loading {romfs_loader.path}: {romfs_loader.status}...")
+                if pending_level_file is not None:
+                    imgui.text_disabled(f"(will open {pending_level_file})")
+                imgui.progress_bar(romfs_loader.progress, (100 * current_scale, 0))
+                if imgui.menu_item("Cancel")[0]:
+                    romfs_loader.cancel()
+
+            elif current_actor_database is not None and current_actor_database.is_indexing():
+                imgui.text_disabled(f"{current_actor_database.status}...")
+                imgui.progress_bar(current_actor_database.progress, (100 * current_scale, 0))
+
             imgui.end_main_menu_bar()
 
         if current_level_data is not None:
-            if not current_level_data.render_window(current_scale):
-                current_level_data = None
+            with frame_timer.section("LevelData.render_window"):
+                if not current_level_data.render_window(current_scale):
+                    current_level_data = None
 
         if current_level_data is not None:
-            current_level_data.draw_visible_actors(current_scale)
+            with frame_timer.section("LevelData.draw_visible_actors"):
+                current_level_data.draw_visible_actors(current_scale)
+
+        with frame_timer.section("draw_open_editors"):
+            draw_open_editors(current_scale, open_editors)
 
-        draw_open_editors(current_scale, open_editors)
         if file_browser is not None and file_browser.is_open():
-            file_browser.draw(current_scale, open_editors)
+            with frame_timer.section("FileBrowser.draw"):
+                file_browser.draw(current_scale, open_editors)
 
-        imgui.show_test_window()
+        if current_actor_database is not None and (index_error := current_actor_database.take_error()) is not None:
+            current_error_message = f"Unable to index the actors of {current_actor_database.root}: {index_error}"
+
+        if actor_search is not None:
+            # Also while the window is closed, so the pool is shut down once the search finishes
+            actor_search.poll()
+
+        if actor_search is not None and actor_search.is_open():
+            with frame_timer.section("ActorSearch.draw"):
+                if (search_result := actor_search.draw(current_scale)) is not None:
+                    open_search_result(search_result)
+
+        frame_timer.draw_overlay(current_scale, preferences.data_directory())
+        frame_profiler.draw_report(current_scale)
+
+        if global_preferences.get("show_demo_window", False):
+            imgui.show_test_window()
 
         gl.glClearColor(0, 0, 0, 1)
         gl.glClear(gl.GL_COLOR_BUFFER_BIT)
 
-        imgui.render()
-        impl.render(imgui.get_draw_data())
-        glfw.swap_buffers(window)
+        with frame_timer.section("render"):
+            imgui.render()
+            impl.render(imgui.get_draw_data())
+            glfw.swap_buffers(window)
+        frame_timer.end_frame()
+        frame_profiler.end_frame()
+        session.end_frame()
+
+        io = imgui.get_io()
+        busy = (romfs_loader is not None or io.want_text_input or imgui.is_any_item_active()
+                or (actor_search is not None and actor_search.is_searching())
+                or (current_actor_database is not None and current_actor_database.is_indexing()))
 
         if pending_load_last_romfs and global_preferences.get("last_romfs") and global_preferences.get("last_game") is not None:
             pending_load_last_romfs = False
             try:
-                current_game = Game(global_preferences["last_game"])
-                load_romfs(Path(global_preferences["last_romfs"]))
+                load_romfs(Path(global_preferences["last_romfs"]), Game(global_preferences["last_game"]),
+                           forget_on_error=True)
             except Exception as e:
                 logging.exception(f"Unable to re-open last romfs: {e}")
                 global_preferences["last_romfs"] = None
                 global_preferences["last_game"] = None
                 save_preferences()
 
+    stop_background_jobs()
+    # Changes like zooming are only saved once they end, which might not have happened yet
+    save_preferences()
+    session.close(frame_timer)
     impl.shutdown()
     glfw.terminate()
 
 
 def main_loop():
-    return loop()
+    parser = argparse.ArgumentParser()
+    sessions = parser.add_mutually_exclusive_group()
+    sessions.add_argument("--record", type=Path, help="Record all input of this session to the given file.")
+    sessions.add_argument("--replay", type=Path,
+                          help="Replay a recorded session frame for frame, then report the frame times.")
+    args = parser.parse_args()
+
+    return loop(args.record, args.replay)
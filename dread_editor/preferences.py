@@ -7,6 +7,15 @@ preferences_file_path = Path("preferences.json")
 global_preferences: Dict[str, typing.Any] = {}
 
 
+def data_directory() -> Path:
+    """Where the preferences and every other file the editor keeps, like caches and reports, are saved."""
+    return preferences_file_path.absolute().parent
+
+
+def data_file_path(name: str) -> Path:
+    return data_directory().joinpath(name)
+
+
 def load_preferences():
     global global_preferences
     if preferences_file_path.exists():
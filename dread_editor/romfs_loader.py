@@ -0,0 +1,82 @@
+import logging
+import threading
+import time
+from pathlib import Path
+from typing import Optional
+
+from mercury_engine_data_structures.file_tree_editor import FileTreeEditor, Game
+
+from dread_editor import asset_cache
+from dread_editor.asset_catalogue import AssetCatalogue
+
+
+class LoadCancelled(Exception):
+    pass
+
+
+class RomfsLoader:
+    """Loads a RomFS in a worker thread. Only `catalogue` can be read before `is_done` returns True."""
+    status: str = "Starting"
+    progress: float = 0.0
+    error: Optional[Exception] = None
+
+    pkg_editor: Optional[FileTreeEditor] = None
+    catalogue: Optional[AssetCatalogue] = None
+    fingerprint: Optional[str] = None
+
+    def __init__(self, path: Path, game: Game):
+        self.path = path
+        self.game = game
+        self._cancelled = threading.Event()
+        self._thread = threading.Thread(target=self._run, name=f"RomfsLoader-{path.name}", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def cancel(self):
+        self._cancelled.set()
+
+    def is_cancelled(self) -> bool:
+        return self._cancelled.is_set()
+
+    def is_done(self) -> bool:
+        return not self._thread.is_alive()
+
+    def wait(self):
+        self._thread.join()
+
+    def wait_for_catalogue(self):
+        while self.catalogue is None and self._thread.is_alive():
+            time.sleep(0.005)
+
+    def _set_status(self, status: str, progress: float):
+        if self._cancelled.is_set():
+            raise LoadCancelled()
+        self.status = status
+        self.progress = progress
+
+    def _run(self):
+        try:
+            self._set_status("Checking asset cache", 0.0)
+            self.fingerprint = asset_cache.romfs_fingerprint(self.path)
+            self.catalogue = asset_cache.load_cached_catalogue(self.path, self.game, self.fingerprint)
+
+            self._set_status("Reading pkg headers", 0.1)
+            pkg_editor = FileTreeEditor(self.path, self.game)
+
+            if self.catalogue is None:
+                self._set_status("Indexing assets", 0.8)
+                self.catalogue = AssetCatalogue.from_asset_names(pkg_editor.all_asset_names())
+                # Raises if the load was cancelled while indexing, so a cancelled load never replaces the cache
+                self._set_status("Saving asset cache", 0.9)
+                asset_cache.save_catalogue_cache(self.path, self.game, self.fingerprint, self.catalogue)
+
+            self._set_status("Done", 1.0)
+            self.pkg_editor = pkg_editor
+
+        except LoadCancelled:
+            pass
+
+        except Exception as e:
+            logging.exception(f"Unable to load romfs at {self.path}: {e}")
+            self.error = e
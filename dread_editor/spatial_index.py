@@ -0,0 +1,103 @@
+import math
+import typing
+
+Key = typing.TypeVar("Key")
+
+
+class SpatialGrid(typing.Generic[Key]):
+    """A uniform grid over world positions, for finding the entries inside a rectangle."""
+
+    def __init__(self, entries: typing.Iterable[tuple[Key, float, float]], cell_size: typing.Optional[float] = None):
+        entries = list(entries)
+        self.count = len(entries)
+
+        if entries:
+            xs = [x for _, x, _ in entries]
+            ys = [y for _, _, y in entries]
+            self.bounds = (min(xs), min(ys), max(xs), max(ys))
+        else:
+            self.bounds = None
+
+        if cell_size is None:
+            if self.bounds is not None:
+                extent = max(self.bounds[2] - self.bounds[0], self.bounds[3] - self.bounds[1])
+            else:
+                extent = 1.0
+            # Around one entry per cell on average, if they were evenly spread
+            cell_size = extent / max(1.0, math.sqrt(len(entries)))
+
+        self.cell_size = max(cell_size, 1.0)
+        self.cells: dict[tuple[int, int], list[tuple[Key, float, float]]] = {}
+
+        for entry in entries:
+            cell = self._cell_for(entry[1], entry[2])
+            if cell not in self.cells:
+                self.cells[cell] = []
+            self.cells[cell].append(entry)
+
+    def is_inside(self, x1: float, y1: float, x2: float, y2: float) -> bool:
+        """If all entries are inside the given rectangle, with x1 <= x2 and y1 <= y2."""
+        if self.bounds is None:
+            return True
+        min_x, min_y, max_x, max_y = self.bounds
+        return x1 <= min_x and y1 <= min_y and max_x <= x2 and max_y <= y2
+
+    def move(self, key: Key, old_x: float, old_y: float, x: float, y: float):
+        """Moves the entry with the given key from its old position. Does nothing if there's no such entry."""
+        old_cell = self._cell_for(old_x, old_y)
+        entries = self.cells.get(old_cell, [])
+        remaining = [entry for entry in entries if entry[0] != key]
+        if len(remaining) == len(entries):
+            return
+
+        if remaining:
+            self.cells[old_cell] = remaining
+        else:
+            del self.cells[old_cell]
+        self.cells.setdefault(self._cell_for(x, y), []).append((key, x, y))
+
+        # Only grows, so the bounds might be bigger than needed but still contain every entry
+        min_x, min_y, max_x, max_y = self.bounds
+        self.bounds = (min(min_x, x), min(min_y, y), max(max_x, x), max(max_y, y))
+
+    def _cell_for(self, x: float, y: float) -> tuple[int, int]:
+        return math.floor(x / self.cell_size), math.floor(y / self.cell_size)
+
+    def query_rect(self, x1: float, y1: float, x2: float, y2: float) -> typing.Iterator[tuple[Key, float, float]]:
+        """All entries inside the given rectangle. The corners can be in any order."""
+        if self.bounds is None:
+            return
+
+        # Only the part of the rectangle that has entries is looked at, which also keeps infinite corners away
+        # from math.floor
+        bounds_x1, bounds_y1, bounds_x2, bounds_y2 = self.bounds
+        min_x, max_x = max(bounds_x1, min(x1, x2)), min(bounds_x2, max(x1, x2))
+        min_y, max_y = max(bounds_y1, min(y1, y2)), min(bounds_y2, max(y1, y2))
+        if min_x > max_x or min_y > max_y:
+            return
+
+        cell_x1, cell_y1 = self._cell_for(min_x, min_y)
+        cell_x2, cell_y2 = self._cell_for(max_x, max_y)
+
+        # When the rectangle covers more cells than exist, walking the cells is cheaper
+        if (cell_x2 - cell_x1 + 1) * (cell_y2 - cell_y1 + 1) > len(self.cells):
+            cells = (
+                entries
+                for (cell_x, cell_y), entries in self.cells.items()
+                if cell_x1 <= cell_x <= cell_x2 and cell_y1 <= cell_y <= cell_y2
+            )
+        else:
+            cells = (
+                self.cells[cell]
+                for cell in (
+                    (cell_x, cell_y)
+                    for cell_x in range(cell_x1, cell_x2 + 1)
+                    for cell_y in range(cell_y1, cell_y2 + 1)
+                )
+                if cell in self.cells
+            )
+
+        for entries in cells:
+            for entry in entries:
+                if min_x <= entry[1] <= max_x and min_y <= entry[2] <= max_y:
+                    yield entry
@@ -1,4 +1,5 @@
 import enum
+import functools
 import typing
 
 import imgui
@@ -85,6 +86,79 @@ PRIMITIVE_RENDERS = {
 }
 
 
+class StructField(typing.NamedTuple):
+    name: str
+    type_data: BaseType
+    tooltip: str
+
+
+class TypeMetadata:
+    """What TypeTreeRender looks up about the types of a TypeLib, resolved once and never invalidated."""
+
+    def __init__(self, type_lib: TypeLib):
+        self.type_lib = type_lib
+        self._types: dict[str, BaseType] = {}
+        self._one_column: dict[str, bool] = {}
+        self._pointer_options: dict[str, list[str]] = {}
+        self._struct_plans: dict[str, list[StructField]] = {}
+        self._enum_classes: dict[str, typing.Type[enum.IntEnum]] = {}
+
+    def get_type(self, type_name: str) -> BaseType:
+        """Same as `TypeLib.get_type`, following typedefs."""
+        if (result := self._types.get(type_name)) is None:
+            result = self._types[type_name] = self.type_lib.get_type(type_name)
+        return result
+
+    def uses_one_column(self, type_data: BaseType) -> bool:
+        """If the type is rendered in a single column, unless it has a specific render."""
+        if (result := self._one_column.get(type_data.name)) is None:
+            if type_data.kind == TypeKind.PRIMITIVE:
+                assert isinstance(type_data, PrimitiveType)
+                result = PRIMITIVE_RENDERS[type_data.primitive_kind].uses_one_column(type_data)
+            else:
+                result = type_data.kind not in {TypeKind.VECTOR, TypeKind.DICTIONARY, TypeKind.POINTER,
+                                                TypeKind.STRUCT}
+            self._one_column[type_data.name] = result
+        return result
+
+    def pointer_options(self, target: str) -> list[str]:
+        """"None" followed by the sorted names of all types a pointer to `target` can hold."""
+        if (result := self._pointer_options.get(target)) is None:
+            result = self._pointer_options[target] = ["None", *sorted(self.type_lib.get_all_children_for(target))]
+        return result
+
+    def struct_plan(self, type_data: StructType) -> list[StructField]:
+        """
+        All fields of the struct in the order they're rendered: the fields inherited from each parent first, starting
+        with the topmost one, then the struct's own fields.
+        """
+        if (result := self._struct_plans.get(type_data.name)) is None:
+            result = []
+            if type_data.parent is not None:
+                parent = self.get_type(type_data.parent)
+                assert isinstance(parent, StructType)
+                result.extend(self.struct_plan(parent))
+
+            for field_name, field_type in type_data.fields.items():
+                field_type_data = self.get_type(field_type)
+                result.append(StructField(
+                    field_name, field_type_data,
+                    f"Field of class {type_data.name} of type {field_type_data.name}.",
+                ))
+            self._struct_plans[type_data.name] = result
+        return result
+
+    def enum_class(self, type_data: EnumType) -> typing.Type[enum.IntEnum]:
+        if (result := self._enum_classes.get(type_data.name)) is None:
+            result = self._enum_classes[type_data.name] = type_data.enum_class()
+        return result
+
+
+@functools.lru_cache(maxsize=None)
+def type_metadata(type_lib: TypeLib) -> TypeMetadata:
+    return TypeMetadata(type_lib)
+
+
 class TypeTreeRender:
     specific_renders: dict[str, SpecificTypeRender]
 
@@ -93,6 +167,7 @@ class TypeTreeRender:
         self.memory = {}
         self.specific_renders = {}
         self.type_lib = type_lib
+        self.metadata = type_metadata(type_lib)
 
     def print_once(self, path, msg):
         if path not in self._debug_once:
@@ -103,14 +178,7 @@ class TypeTreeRender:
         if (specific_render := self.specific_renders.get(type_data.name)) is not None:
             return specific_render.uses_one_column(type_data)
 
-        if type_data.kind == TypeKind.PRIMITIVE:
-            assert isinstance(type_data, PrimitiveType)
-            return PRIMITIVE_RENDERS[type_data.primitive_kind].uses_one_column(type_data)
-
-        if type_data.kind in {TypeKind.VECTOR, TypeKind.DICTIONARY, TypeKind.POINTER, TypeKind.STRUCT}:
-            return False
-
-        return True
+        return self.metadata.uses_one_column(type_data)
 
     def create_default_of_type(self, type_data: BaseType):
         if (specific_render := self.specific_renders.get(type_data.name)) is not None:
@@ -205,7 +273,7 @@ class TypeTreeRender:
             return imgui.button("New Item"), value.append
 
         return self._render_container_of_type(
-            value, self.type_lib.get_type(type_data.value_type), path,
+            value, self.metadata.get_type(type_data.value_type), path,
             imgui.TREE_NODE_DEFAULT_OPEN if len(value) < 50 else 0,
             lambda v: enumerate(v),
             lambda k: f"Item {k}",
@@ -214,7 +282,7 @@ class TypeTreeRender:
         )
 
     def render_dict_of_type(self, value: dict, type_data: DictionaryType, path: str):
-        key_type = self.type_lib.get_type(type_data.key_type)
+        key_type = self.metadata.get_type(type_data.key_type)
 
         if isinstance(key_type, PrimitiveType) and key_type.primitive_kind == PrimitiveKind.STRING:
             def new_item_prompt():
@@ -227,7 +295,7 @@ class TypeTreeRender:
                 return imgui.button("New Item"), item_add
 
             return self._render_container_of_type(
-                value, self.type_lib.get_type(type_data.value_type), path,
+                value, self.metadata.get_type(type_data.value_type), path,
                 0,
                 lambda v: v.items(),
                 lambda k: k,
@@ -241,8 +309,7 @@ class TypeTreeRender:
             return False, value
 
     def render_ptr_of_type(self, value, type_data: PointerType, path: str):
-        all_options = sorted(self.type_lib.get_all_children_for(type_data.target))
-        all_options.insert(0, "None")
+        all_options = self.metadata.pointer_options(type_data.target)
 
         value_type_name: str
 
@@ -265,7 +332,7 @@ class TypeTreeRender:
             if value_type_name == "None":
                 return None
             else:
-                return self.create_default_of_type(self.type_lib.get_type(value_type_name))
+                return self.create_default_of_type(self.metadata.get_type(value_type_name))
 
         # TODO: this check doesn't make sense
         if self.type_uses_one_column(type_data):
@@ -285,7 +352,7 @@ class TypeTreeRender:
             if value_type_name == "None":
                 imgui.text("None")
             else:
-                value_type_data = self.type_lib.get_type(value_type_name)
+                value_type_data = self.metadata.get_type(value_type_name)
                 if not self.type_uses_one_column(value_type_data):
                     imgui.text(f"Expected type {value_type_name} to use one column")
                 else:
@@ -305,24 +372,24 @@ class TypeTreeRender:
                 value = create_default(value_type_name)
 
             if value_type_name != "None":
-                value_type_data = self.type_lib.get_type(value_type_name)
+                value_type_data = self.metadata.get_type(value_type_name)
                 value_changed, value = self.render_value_of_type(value, value_type_data, f"{path}.Deref")
                 changed = changed or value_changed
 
             return changed, value
 
     def render_enum_of_type(self, value: enum.IntEnum, type_data: EnumType, path: str) -> tuple[bool, typing.Any]:
-        changed, selected = imgui_util.combo_enum("##" + path, value, type_data.enum_class())
+        changed, selected = imgui_util.combo_enum("##" + path, value, self.metadata.enum_class(type_data))
         if changed:
             return True, selected
         else:
             return False, value
 
     def render_flagset_of_type(self, value: dict, type_data: FlagsetType, path: str) -> tuple[bool, typing.Any]:
-        enum_data = self.type_lib.get_type(type_data.enum)
+        enum_data = self.metadata.get_type(type_data.enum)
         assert isinstance(enum_data, EnumType)
 
-        changed, selected = imgui_util.combo_flagset(path, value, enum_data.enum_class())
+        changed, selected = imgui_util.combo_flagset(path, value, self.metadata.enum_class(enum_data))
         if changed:
             return True, selected
         else:
@@ -331,16 +398,8 @@ class TypeTreeRender:
     def render_struct_of_type(self, value, type_data: StructType, path: str) -> tuple[bool, typing.Any]:
         modified = False
 
-        if type_data.parent is not None:
-            parent = self.type_lib.get_type(type_data.parent)
-            assert isinstance(parent, StructType)
-            modified, value = self.render_struct_of_type(value, parent, path)
-
-        for field_name, field_type in type_data.fields.items():
-            field_type_data = self.type_lib.get_type(field_type)
-
+        for field_name, field_type_data, tooltip in self.metadata.struct_plan(type_data):
             field_path = f"{path}.{field_name}"
-            tooltip = f"Field of class {type_data.name} of type {field_type_data.name}."
 
             field_present = field_name in value
             present_changed, field_present = imgui.checkbox(f"##{field_path}_present", field_present)
@@ -0,0 +1,58 @@
+import construct
+import pytest
+
+from dread_editor.actor_filter import ActorFilter
+
+
+@pytest.fixture()
+def actor():
+    return construct.Container(
+        oActorDefLink="actors/props/doorpowerpower/charclasses/doorpowerpower.bmsad",
+        pComponents=construct.Container(LIFE=construct.Container(), MODELUPDATER=construct.Container()),
+    )
+
+
+def test_case_sensitive_name(actor):
+    actor_filter = ActorFilter()
+    actor_filter.case_sensitive_name = True
+
+    actor_filter.name_filter = "Door"
+    assert actor_filter.passes("Door000", actor)
+    assert not actor_filter.passes("door000", actor)
+
+    actor_filter.name_filter = "-Door"
+    assert not actor_filter.passes("Door000", actor)
+    assert actor_filter.passes("door000", actor)
+
+
+def test_case_insensitive_name(actor):
+    actor_filter = ActorFilter()
+
+    actor_filter.name_filter = "DOOR, -frame"
+    assert actor_filter.passes("door000", actor)
+    assert actor_filter.passes("Door000", actor)
+    assert not actor_filter.passes("DoorFrame000", actor)
+    assert not actor_filter.passes("Spawnpoint000", actor)
+
+
+@pytest.mark.parametrize("name_filter", ["", "   ", " , ,", "-"])
+def test_empty_name_filter(actor, name_filter):
+    actor_filter = ActorFilter()
+    actor_filter.name_filter = name_filter
+
+    assert actor_filter.is_empty
+    assert actor_filter.included_names == ()
+    assert actor_filter.passes("Door000", actor)
+
+
+def test_component_and_actordef(actor):
+    actor_filter = ActorFilter()
+
+    actor_filter.expected_component = "life"
+    assert actor_filter.passes("Door000", actor)
+
+    actor_filter.expected_actordef = "doorpowerpower"
+    assert actor_filter.passes("Door000", actor)
+
+    actor_filter.expected_component = "ENEMY"
+    assert not actor_filter.passes("Door000", actor)
@@ -0,0 +1,86 @@
+import pytest
+from mercury_engine_data_structures.game_check import Game
+
+from dread_editor.actor_groups import ActorGroupIndex, actor_key_of_link
+from dread_editor.level_data_dread import LevelDataDread
+from dread_editor.level_data_sr import LevelDataSR
+from tools.benchmark import synthetic_levels
+
+
+@pytest.fixture()
+def dread_level():
+    bmscc = synthetic_levels.make_bmscc()
+    return LevelDataDread("maps/levels/c10_samus/s010_synthetic/s010_synthetic.brfld",
+                          synthetic_levels.make_brfld(2, 6, actor_groups=3), bmscc, {},
+                          synthetic_levels.display_borders_for(bmscc))
+
+
+@pytest.fixture()
+def sr_level():
+    bmscc = synthetic_levels.make_bmscc(target_game=Game.SAMUS_RETURNS)
+    return LevelDataSR("maps/levels/c10_samus/s000_synthetic/s000_synthetic.bmsld",
+                       synthetic_levels.make_bmsld(2, 6, actor_groups=3), bmscc, {},
+                       synthetic_levels.display_borders_for(bmscc))
+
+
+def test_actor_key_of_link():
+    link = "Root:pScenario:rEntitiesLayer:dctSublayers:default:dctActors:door"
+    assert actor_key_of_link(link) == ("default", "door")
+    assert actor_key_of_link("Root:pScenario:rEntitiesLayer:dctSublayers:default") is None
+
+
+def test_index():
+    index = ActorGroupIndex(["b", "a", "b"], [("a", "door"), ("b", "door"), ("b", "item")])
+    assert index.names == ["a", "b"]
+    assert index.groups_of("door") == {"a", "b"}
+    assert index.groups_of("missing") == set()
+
+    index.remove("a", "door")
+    index.add("a", "item")
+    assert index.groups_of("door") == {"b"}
+    assert index.groups_of("item") == {"a", "b"}
+
+
+def test_dread_add_and_remove(dread_level):
+    brfld = dread_level.brfld
+    group_name = "eg_collision_camera_001"
+    layer_name = "layer_001"
+    # The generator adds each actor to one group, in turn
+    actor_name = list(brfld.actors_for_layer(layer_name))[0]
+    member = dread_level.actor_group_member(layer_name, actor_name)
+
+    groups = dread_level.actor_groups()
+    assert groups.names == ["eg_collision_camera_000", "eg_collision_camera_001", "eg_collision_camera_002"]
+    assert groups.groups_of(member) == {"eg_collision_camera_000"}
+
+    dread_level.add_actor_to_group(group_name, layer_name, actor_name)
+    assert groups.groups_of(member) == {"eg_collision_camera_000", group_name}
+    assert (layer_name, actor_name) in {actor_key_of_link(link) for link in brfld.get_actor_group(group_name)}
+
+    dread_level.remove_actor_from_group(group_name, layer_name, actor_name)
+    assert groups.groups_of(member) == {"eg_collision_camera_000"}
+    assert (layer_name, actor_name) not in {actor_key_of_link(link) for link in brfld.get_actor_group(group_name)}
+
+    # Built again from the level, the index is the same as the one kept up to date
+    assert dread_level.build_actor_groups().groups_of(member) == groups.groups_of(member)
+
+
+def test_sr_add_and_remove(sr_level):
+    bmsld = sr_level.bmsld
+    group_name = "eg_SubArea_collision_camera_001"
+    layer_name = "1"
+    actor_name = list(sr_level.actors_in_layer(layer_name))[0]
+    member = sr_level.actor_group_member(layer_name, actor_name)
+
+    groups = sr_level.actor_groups()
+    assert groups.groups_of(member) == {"eg_SubArea_collision_camera_000"}
+
+    sr_level.add_actor_to_group(group_name, layer_name, actor_name)
+    assert groups.groups_of(member) == {"eg_SubArea_collision_camera_000", group_name}
+    assert actor_name in bmsld.get_actor_group(group_name).names
+
+    sr_level.remove_actor_from_group(group_name, layer_name, actor_name)
+    assert groups.groups_of(member) == {"eg_SubArea_collision_camera_000"}
+    assert actor_name not in bmsld.get_actor_group(group_name).names
+
+    assert sr_level.build_actor_groups().groups_of(member) == groups.groups_of(member)
@@ -0,0 +1,93 @@
+import random
+
+import pytest
+
+from dread_editor.actor_filter import ActorFilter
+from dread_editor.actor_index import ActorIndex, NGRAM_LENGTH
+from tools.benchmark.synthetic_levels import make_dread_actor
+
+NAMES = ["Door000", "doorFrame001", "DOOR_Power", "SpawnPoint", "spawnpoint_boss", "Dr", "Platform_Door"]
+
+
+@pytest.fixture()
+def actors():
+    rng = random.Random(0)
+    return {
+        (f"layer{i % 2}", name): make_dread_actor(rng, name, components=1 + i % 4)
+        for i, name in enumerate(NAMES)
+    }
+
+
+def _check(actor_filter: ActorFilter, actors) -> set:
+    """The candidates must include every actor that passes the filter."""
+    index = ActorIndex.build(actor_filter, actors.items())
+    candidates = index.candidates()
+    passing = {key for key, actor in actors.items() if actor_filter.passes(key[1], actor)}
+    assert passing <= candidates
+    return passing
+
+
+def test_no_filter(actors):
+    actor_filter = ActorFilter()
+    assert _check(actor_filter, actors) == set(actors)
+    assert ActorIndex.build(actor_filter, actors.items()).candidates() == set(actors)
+
+
+def test_query_shorter_than_ngrams(actors):
+    actor_filter = ActorFilter()
+    actor_filter.name_filter = "d" * (NGRAM_LENGTH - 1)
+    assert ActorIndex.build(actor_filter, actors.items()).candidates() == set(actors)
+
+    actor_filter.name_filter = "Dr"
+    assert {key[1] for key in _check(actor_filter, actors)} == {"Dr"}
+
+
+def test_case_insensitive(actors):
+    actor_filter = ActorFilter()
+    actor_filter.name_filter = "DoOr"
+    index = ActorIndex.build(actor_filter, actors.items())
+
+    assert {key[1] for key in _check(actor_filter, actors)} == {"Door000", "doorFrame001", "DOOR_Power",
+                                                                "Platform_Door"}
+    assert {key[1] for key in index.candidates()} == {"Door000", "doorFrame001", "DOOR_Power", "Platform_Door"}
+
+
+def test_case_sensitive(actors):
+    actor_filter = ActorFilter()
+    actor_filter.case_sensitive_name = True
+    actor_filter.name_filter = "Door"
+    assert {key[1] for key in _check(actor_filter, actors)} == {"Door000", "Platform_Door"}
+
+
+def test_exclusions(actors):
+    actor_filter = ActorFilter()
+    actor_filter.name_filter = "door, -frame"
+    assert {key[1] for key in _check(actor_filter, actors)} == {"Door000", "DOOR_Power", "Platform_Door"}
+
+
+def test_component(actors):
+    actor_filter = ActorFilter()
+    actor_filter.expected_component = "collision"
+    passing = _check(actor_filter, actors)
+    assert passing
+    assert ActorIndex.build(actor_filter, actors.items()).candidates() == passing
+
+
+def test_actordef(actors):
+    actor_filter = ActorFilter()
+    actor_filter.expected_actordef = "spawnpoint"
+    passing = _check(actor_filter, actors)
+    assert {key[1] for key in passing} == {"spawnpoint_boss"}
+
+
+def test_update(actors):
+    actor_filter = ActorFilter()
+    actor_filter.name_filter = "door"
+    index = ActorIndex.build(actor_filter, actors.items())
+
+    key = ("layer0", "Door000")
+    index.update(key, None)
+    assert key not in index.candidates()
+
+    index.update(key, actors[key])
+    assert key in index.candidates()
@@ -0,0 +1,79 @@
+import json
+
+import pytest
+from mercury_engine_data_structures.file_tree_editor import Game
+
+from dread_editor import asset_cache, preferences
+from dread_editor.asset_catalogue import AssetCatalogue
+
+
+@pytest.fixture()
+def data_directory(tmp_path, monkeypatch):
+    monkeypatch.setattr(preferences, "preferences_file_path", tmp_path.joinpath("data", "preferences.json"))
+    tmp_path.joinpath("data").mkdir()
+    return tmp_path.joinpath("data")
+
+
+@pytest.fixture()
+def romfs(tmp_path):
+    root = tmp_path.joinpath("romfs")
+    root.joinpath("packs").mkdir(parents=True)
+    root.joinpath("packs", "system.pkg").write_bytes(b"pkg")
+    return root
+
+
+@pytest.fixture()
+def catalogue():
+    return AssetCatalogue.from_asset_names(["actors/door.bmsad", "maps/s010_cave.brfld"])
+
+
+def test_save_and_load(data_directory, romfs, catalogue):
+    fingerprint = asset_cache.romfs_fingerprint(romfs)
+    asset_cache.save_catalogue_cache(romfs, Game.DREAD, fingerprint, catalogue)
+
+    loaded = asset_cache.load_cached_catalogue(romfs, Game.DREAD, fingerprint)
+    assert loaded is not None
+    assert loaded.all_names == catalogue.all_names
+    assert loaded.by_extension == catalogue.by_extension
+
+    assert asset_cache.load_cached_catalogue(romfs, Game.SAMUS_RETURNS, fingerprint) is None
+    assert list(data_directory.iterdir()) == [data_directory.joinpath("asset_cache.json")]
+
+
+def test_corrupt_file(data_directory, romfs, catalogue):
+    fingerprint = asset_cache.romfs_fingerprint(romfs)
+    asset_cache.save_catalogue_cache(romfs, Game.DREAD, fingerprint, catalogue)
+
+    cache_file = data_directory.joinpath("asset_cache.json")
+    cache_file.write_text(cache_file.read_text()[:20])
+    assert asset_cache.load_cached_catalogue(romfs, Game.DREAD, fingerprint) is None
+
+    # Saving again replaces the corrupt file
+    asset_cache.save_catalogue_cache(romfs, Game.DREAD, fingerprint, catalogue)
+    assert asset_cache.load_cached_catalogue(romfs, Game.DREAD, fingerprint) is not None
+
+
+def test_malformed_entry(data_directory, romfs):
+    data_directory.joinpath("asset_cache.json").write_text(json.dumps({
+        "version": 1,
+        "roots": {str(romfs.absolute()): {"fingerprint": "x"}},
+    }))
+    assert asset_cache.load_cached_catalogue(romfs, Game.DREAD, "x") is None
+
+
+def test_library_version_mismatch(data_directory, romfs, catalogue, monkeypatch):
+    fingerprint = asset_cache.romfs_fingerprint(romfs)
+    asset_cache.save_catalogue_cache(romfs, Game.DREAD, fingerprint, catalogue)
+
+    monkeypatch.setattr(asset_cache, "_LIBRARY_VERSION", "0.0.0")
+    assert asset_cache.load_cached_catalogue(romfs, Game.DREAD, fingerprint) is None
+
+
+def test_fingerprint_mismatch(data_directory, romfs, catalogue):
+    fingerprint = asset_cache.romfs_fingerprint(romfs)
+    asset_cache.save_catalogue_cache(romfs, Game.DREAD, fingerprint, catalogue)
+
+    romfs.joinpath("packs", "new.pkg").write_bytes(b"new pkg")
+    new_fingerprint = asset_cache.romfs_fingerprint(romfs)
+    assert new_fingerprint != fingerprint
+    assert asset_cache.load_cached_catalogue(romfs, Game.DREAD, new_fingerprint) is None
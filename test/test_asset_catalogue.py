@@ -0,0 +1,46 @@
+import json
+
+from dread_editor.asset_catalogue import AssetCatalogue, extension_of
+
+NAMES = [
+    "system/files.toc",
+    "actors/props/door/charclasses/door.bmsad",
+    "actors/props/door/models/door.bcmdl",
+    "actors/items/tank/charclasses/tank.bmsad",
+    "maps/levels/c10_samus/s010_cave/s010_cave.brfld",
+    "README",
+]
+
+
+def test_extension_of():
+    assert extension_of("a/b/c.bmsad") == ".bmsad"
+    assert extension_of("a/b.c/README") == ""
+    assert extension_of("a/.hidden") == ""
+
+
+def test_from_asset_names():
+    catalogue = AssetCatalogue.from_asset_names(NAMES)
+
+    assert catalogue.all_names == sorted(NAMES)
+    assert catalogue.with_extension(".bmsad") == [
+        "actors/items/tank/charclasses/tank.bmsad",
+        "actors/props/door/charclasses/door.bmsad",
+    ]
+    assert catalogue.with_extension("") == ["README"]
+    assert catalogue.with_extension(".txt") == []
+    assert catalogue.actordefs == [
+        "actordef:actors/items/tank/charclasses/tank.bmsad",
+        "actordef:actors/props/door/charclasses/door.bmsad",
+    ]
+    assert list(catalogue.file_tree) == ["README", "actors", "maps", "system"]
+    assert catalogue.file_tree["actors"]["props"]["door"]["models"] == {"door.bcmdl": True}
+
+
+def test_json_round_trip():
+    catalogue = AssetCatalogue.from_asset_names(NAMES)
+    loaded = AssetCatalogue.from_json(json.loads(json.dumps(catalogue.as_json())))
+
+    assert loaded.all_names == catalogue.all_names
+    assert loaded.by_extension == catalogue.by_extension
+    assert loaded.file_tree == catalogue.file_tree
+    assert loaded.actordefs == catalogue.actordefs
@@ -0,0 +1,28 @@
+import pytest
+
+from dread_editor.level_canvas import simplify_polyline
+
+
+def test_keeps_spike_past_the_end_of_the_segment():
+    # The spike is on the line through the first and last points, but far past the end of the segment between them
+    points = [(0.0, 0.0), (10.0, 0.0), (100.0, 0.0), (5.0, 0.0), (20.0, 0.0)]
+    assert (100.0, 0.0) in simplify_polyline(points, 1.0)
+
+
+@pytest.mark.parametrize("points", [
+    [],
+    [(1.0, 2.0)],
+    [(1.0, 2.0), (3.0, 4.0)],
+])
+def test_few_points(points):
+    assert simplify_polyline(points, 1.0) == points
+
+
+def test_collinear_points():
+    points = [(float(i), 2.0 * i) for i in range(10)]
+    assert simplify_polyline(points, 0.5) == [points[0], points[-1]]
+
+
+def test_removes_small_details():
+    points = [(0.0, 0.0), (5.0, 0.2), (10.0, 0.0), (10.0, 10.0)]
+    assert simplify_polyline(points, 1.0) == [(0.0, 0.0), (10.0, 0.0), (10.0, 10.0)]
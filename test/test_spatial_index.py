@@ -0,0 +1,68 @@
+import math
+import random
+
+import pytest
+
+from dread_editor.spatial_index import SpatialGrid
+
+
+def _brute_force(entries, x1, y1, x2, y2):
+    min_x, max_x = min(x1, x2), max(x1, x2)
+    min_y, max_y = min(y1, y2), max(y1, y2)
+    return sorted(entry for entry in entries if min_x <= entry[1] <= max_x and min_y <= entry[2] <= max_y)
+
+
+@pytest.fixture()
+def entries():
+    rng = random.Random(1234)
+    return [(i, rng.uniform(-1000, 1000), rng.uniform(-1000, 1000)) for i in range(500)]
+
+
+@pytest.mark.parametrize("rect", [
+    (-1000, -1000, 1000, 1000),
+    (-10, -10, 10, 10),
+    (250, -300, 400, -100),
+    (400, -100, 250, -300),
+    (5000, 5000, 6000, 6000),
+    (0, 0, 0, 0),
+])
+def test_query_rect_matches_brute_force(entries, rect):
+    grid = SpatialGrid(entries)
+    assert sorted(grid.query_rect(*rect)) == _brute_force(entries, *rect)
+
+
+def test_query_rect_straddling_cell_edges(entries):
+    size = SpatialGrid(entries).cell_size
+    # Corners exactly on cell boundaries, with entries exactly on the rectangle's edges
+    rect = (-2 * size, -size, size, 2 * size)
+    edges = [(1000, rect[0], 0.0), (1001, rect[2], 0.0), (1002, 0.0, rect[1]), (1003, 0.0, rect[3])]
+    grid = SpatialGrid(entries + edges, size)
+
+    result = sorted(grid.query_rect(*rect))
+    assert result == _brute_force(entries + edges, *rect)
+    assert all(edge in result for edge in edges)
+
+
+def test_query_rect_infinite(entries):
+    grid = SpatialGrid(entries)
+    assert sorted(grid.query_rect(-math.inf, -math.inf, math.inf, math.inf)) == sorted(entries)
+    assert sorted(grid.query_rect(0, -math.inf, math.inf, 0)) == _brute_force(entries, 0, -2000, 2000, 0)
+
+
+def test_empty_grid():
+    grid = SpatialGrid([])
+    assert list(grid.query_rect(-10, -10, 10, 10)) == []
+    assert list(grid.query_rect(-math.inf, -math.inf, math.inf, math.inf)) == []
+    assert grid.is_inside(0, 0, 0, 0)
+
+
+def test_move(entries):
+    grid = SpatialGrid(entries)
+    key, x, y = entries[0]
+
+    grid.move(key, x, y, 3000.0, -3000.0)
+    moved = [(key, 3000.0, -3000.0)] + entries[1:]
+    for rect in [(-1000, -1000, 1000, 1000), (2900, -3100, 3100, -2900), (-5000, -5000, 5000, 5000)]:
+        assert sorted(grid.query_rect(*rect)) == _brute_force(moved, *rect)
+
+    assert not grid.is_inside(-1000, -1000, 1000, 1000)
@@ -1,3 +1,5 @@
-from PyInstaller.utils.hooks import collect_data_files
+from PyInstaller.utils.hooks import collect_data_files, copy_metadata
 
 datas = collect_data_files('mercury_engine_data_structures')
+# The asset cache uses the installed version
+datas += copy_metadata('mercury-engine-data-structures')
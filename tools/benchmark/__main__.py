@@ -0,0 +1,186 @@
+"""
+Headless benchmark of the editor's UI hot paths, using a recording stub of imgui.
+
+Usage, from the repository root:
+    python -m tools.benchmark --layers 8 --actors 2000 --frames 100
+    python -m tools.benchmark --scaling 1000,10000,100000 --frames 10
+"""
+import argparse
+import math
+import time
+import typing
+
+from tools.benchmark import imgui_stub
+
+imgui_stub.install()
+
+from mercury_engine_data_structures.game_check import Game  # noqa: E402
+
+from tools.benchmark import synthetic_levels  # noqa: E402
+
+
+class BenchmarkResult:
+    def __init__(self, name: str, frame_times: list[float], imgui_calls: int, draw_calls: int):
+        self.name = name
+        self.frame_times = sorted(frame_times)
+        self.imgui_calls = imgui_calls / len(frame_times)
+        self.draw_calls = draw_calls / len(frame_times)
+
+    @property
+    def mean(self) -> float:
+        return sum(self.frame_times) / len(self.frame_times)
+
+    @property
+    def p99(self) -> float:
+        return self.frame_times[max(0, math.ceil(0.99 * len(self.frame_times)) - 1)]
+
+
+def measure(name: str, frames: int, render: typing.Callable[[], typing.Any]) -> BenchmarkResult:
+    # One untimed frame, so lazy caches don't count towards the steady state
+    render()
+
+    imgui_stub.reset_counters()
+    frame_times = []
+    for _ in range(frames):
+        start = time.perf_counter()
+        render()
+        frame_times.append(time.perf_counter() - start)
+
+    return BenchmarkResult(name, frame_times, sum(imgui_stub.calls.values()), sum(imgui_stub.draw_calls.values()))
+
+
+def print_results(results: list[BenchmarkResult]):
+    header = f"{'benchmark':<48} {'mean ms':>10} {'p99 ms':>10} {'imgui calls':>12} {'draw calls':>12}"
+    print(header)
+    print("-" * len(header))
+    for result in results:
+        print(f"{result.name:<48} {result.mean * 1000:>10.3f} {result.p99 * 1000:>10.3f} "
+              f"{result.imgui_calls:>12.0f} {result.draw_calls:>12.0f}")
+
+
+def make_level_data_dread(args, actors_per_layer: int):
+    from dread_editor.level_data_dread import LevelDataDread
+
+    brfld = synthetic_levels.make_brfld(args.layers, actors_per_layer, components=args.components)
+    bmscc = synthetic_levels.make_bmscc(args.cameras, args.vertices)
+    valid_cameras = {entry.name: True for entry in bmscc.raw.layers[0].entries}
+    level_data = LevelDataDread("maps/levels/c10_samus/s010_synthetic/s010_synthetic.brfld", brfld, bmscc,
+                                valid_cameras, synthetic_levels.display_borders_for(bmscc))
+    level_data.render_scale = args.render_scale
+    return level_data
+
+
+def make_level_data_sr(args, actors_per_layer: int):
+    from dread_editor.level_data_sr import LevelDataSR
+
+    bmsld = synthetic_levels.make_bmsld(min(args.layers, synthetic_levels.SR_LAYER_COUNT), actors_per_layer,
+                                        components=args.components)
+    bmscc = synthetic_levels.make_bmscc(args.cameras, args.vertices, Game.SAMUS_RETURNS)
+    valid_cameras = {entry.name: True for entry in bmscc.raw.layers[0].entries}
+    level_data = LevelDataSR("maps/levels/c10_samus/s000_synthetic/s000_synthetic.bmsld", bmsld, bmscc,
+                             valid_cameras, synthetic_levels.display_borders_for(bmscc))
+    level_data.render_scale = args.render_scale
+    return level_data
+
+
+def all_actors_of(level_data) -> list[tuple[str, str, typing.Any]]:
+    if hasattr(level_data, "brfld"):
+        return list(level_data.brfld.all_actors())
+    return [
+        (str(layer_index), actor_name, actor)
+        for layer_index, layer in enumerate(level_data.bmsld.raw.actors)
+        for actor_name, actor in layer.items()
+    ]
+
+
+def benchmark_level(name: str, level_data, args) -> list[BenchmarkResult]:
+    # Hover the middle of the canvas
+    imgui_stub.mouse_pos = (level_data.render_scale / 2, level_data.render_scale / 2)
+
+    all_actors = all_actors_of(level_data)
+    for layer_name, actor_name, _ in all_actors[:args.open_actors]:
+        level_data.visible_actors[(layer_name, actor_name)] = True
+
+    layer_name, actor_name, actor = all_actors[0]
+    actor_type = level_data.type_lib.get_type(actor["@type"] if "@type" in actor else "ProperActor")
+
+    return [
+        measure(f"{name}.render_window", args.frames, lambda: level_data.render_window(1.0)),
+        measure(f"{name}.draw_visible_actors ({args.open_actors} open)", args.frames,
+                lambda: level_data.draw_visible_actors(1.0)),
+        measure(f"{name} render_value_of_type", args.frames,
+                lambda: level_data.tree_render.render_value_of_type(actor, actor_type, "bench.actor")),
+    ]
+
+
+def benchmark_scaling(args) -> list[BenchmarkResult]:
+    """render_window for each total actor count, to get a scaling curve."""
+    results = []
+    for total_actors in args.scaling:
+        actors_per_layer = max(1, total_actors // args.layers)
+        if args.game in ("dread", "both"):
+            level_data = make_level_data_dread(args, actors_per_layer)
+            imgui_stub.mouse_pos = (level_data.render_scale / 2, level_data.render_scale / 2)
+            results.append(measure(f"LevelDataDread.render_window @{total_actors}", args.frames,
+                                   lambda: level_data.render_window(1.0)))
+        if args.game in ("sr", "both"):
+            sr_layers = min(args.layers, synthetic_levels.SR_LAYER_COUNT)
+            level_data = make_level_data_sr(args, max(1, total_actors // sr_layers))
+            imgui_stub.mouse_pos = (level_data.render_scale / 2, level_data.render_scale / 2)
+            results.append(measure(f"LevelDataSR.render_window @{total_actors}", args.frames,
+                                   lambda: level_data.render_window(1.0)))
+    return results
+
+
+def benchmark_file_browser(args) -> list[BenchmarkResult]:
+    from dread_editor.asset_catalogue import AssetCatalogue
+    from dread_editor.file_browser import FileBrowser
+
+    catalogue = AssetCatalogue.from_asset_names(synthetic_levels.make_asset_names(args.assets))
+    file_browser = FileBrowser(None, catalogue, Game.DREAD)
+
+    return [
+        measure(f"FileBrowser.draw ({args.assets} assets)", args.frames, lambda: file_browser.draw(1.0, {})),
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--frames", type=int, default=50, help="Frames measured for each benchmark")
+    parser.add_argument("--layers", type=int, default=4)
+    parser.add_argument("--actors", type=int, default=1000, help="Actors in each layer")
+    parser.add_argument("--components", type=int, default=2, help="Components in each actor")
+    parser.add_argument("--cameras", type=int, default=16, help="Collision cameras in the level")
+    parser.add_argument("--vertices", type=int, default=64, help="Points in each collision camera polygon")
+    parser.add_argument("--game", choices=["dread", "sr", "both"], default="both")
+    parser.add_argument("--scaling", type=lambda value: [int(count) for count in value.split(",")],
+                        help="Comma separated total actor counts, like 10000,100000. "
+                             "Only measures render_window, once for each count.")
+    parser.add_argument("--render-scale", type=float, default=500.0,
+                        help="Zoom of the level canvas. The whole level fits in the canvas at 500")
+    parser.add_argument("--open-actors", type=int, default=10, help="How many actor windows are open")
+    parser.add_argument("--assets", type=int, default=20000, help="Asset names in the file browser")
+    parser.add_argument("--collapsed", action="store_true", help="Render all tree nodes as closed")
+    parser.add_argument("--focused-actor-details", action="store_true",
+                        help="Only show all fields of the focused actor window, and no window is focused")
+    args = parser.parse_args()
+
+    imgui_stub.open_tree_nodes = not args.collapsed
+
+    from dread_editor.preferences import global_preferences
+    global_preferences["focused_actor_details"] = args.focused_actor_details
+
+    results = []
+    if args.scaling:
+        results.extend(benchmark_scaling(args))
+    else:
+        if args.game in ("dread", "both"):
+            results.extend(benchmark_level("LevelDataDread", make_level_data_dread(args, args.actors), args))
+        if args.game in ("sr", "both"):
+            results.extend(benchmark_level("LevelDataSR", make_level_data_sr(args, args.actors), args))
+        results.extend(benchmark_file_browser(args))
+    print_results(results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,181 @@
+"""
+A recording stand-in for the `imgui` module, so the editor's UI code can run without a window or GL context.
+
+Every call is counted in `calls`, and draw list primitives are counted in `draw_calls`. Widgets report that
+nothing changed, tree nodes are open (unless `open_tree_nodes` is disabled) and popups are closed.
+Call `install()` before importing anything from `dread_editor`.
+"""
+import collections
+import contextlib
+import sys
+import types
+
+calls: collections.Counter = collections.Counter()
+draw_calls: collections.Counter = collections.Counter()
+
+# Knobs for the code under test
+open_tree_nodes = True
+window_hovered = True
+mouse_pos = (0.0, 0.0)
+cursor_screen_pos = (0.0, 0.0)
+window_size = (1280.0, 720.0)
+line_height = 17.0
+scroll_y = 0.0
+
+
+class Vec2(collections.namedtuple("Vec2", ["x", "y"])):
+    pass
+
+
+class _DrawList:
+    def __getattr__(self, name):
+        def add(*args, **kwargs):
+            draw_calls[name] += 1
+
+        setattr(self, name, add)
+        return add
+
+
+class _IO:
+    def __init__(self):
+        self.display_size = window_size
+        self.mouse_pos = mouse_pos
+        self.mouse_delta = Vec2(0.0, 0.0)
+        self.mouse_down = [False] * 5
+        self.mouse_wheel = 0.0
+        self.mouse_wheel_horizontal = 0.0
+        self.delta_time = 1 / 60
+        self.font_global_scale = 1.0
+        self.want_capture_mouse = False
+        self.want_text_input = False
+        self.key_ctrl = False
+        self.key_shift = False
+        self.key_alt = False
+
+
+_draw_list = _DrawList()
+_io = _IO()
+
+
+def reset_counters():
+    calls.clear()
+    draw_calls.clear()
+
+
+def _changed_value(*args, **kwargs):
+    # (label, value, ...) -> (changed, value)
+    return False, args[1]
+
+
+def _changed_values(count: int):
+    def render(*args, **kwargs):
+        return False, tuple(args[1:1 + count])
+
+    return render
+
+
+def _false(*args, **kwargs):
+    return False
+
+
+def _none(*args, **kwargs):
+    return None
+
+
+_returns = {
+    "begin": lambda *args, **kwargs: (True, True),
+    "begin_child": lambda *args, **kwargs: True,
+    "begin_popup": _false,
+    "begin_popup_modal": lambda *args, **kwargs: (False, None),
+    "begin_popup_context_item": _false,
+    "begin_popup_context_window": _false,
+    "begin_menu": _false,
+    "begin_main_menu_bar": _false,
+    "begin_tooltip": _none,
+    "tree_node": lambda *args, **kwargs: open_tree_nodes,
+    "collapsing_header": lambda *args, **kwargs: (open_tree_nodes, None),
+    "button": _false,
+    "invisible_button": _false,
+    "selectable": lambda label, selected=False, *args, **kwargs: (False, selected),
+    "menu_item": lambda label, shortcut=None, selected=False, enabled=True: (False, selected),
+    "checkbox": _changed_value,
+    "input_text": _changed_value,
+    "slider_float": _changed_value,
+    "slider_int": _changed_value,
+    "drag_float": _changed_value,
+    "drag_int": _changed_value,
+    "combo": _changed_value,
+    "slider_float2": _changed_values(2),
+    "input_float2": _changed_values(2),
+    "input_float3": _changed_values(3),
+    "input_float4": _changed_values(4),
+    "is_item_hovered": _false,
+    "is_item_active": _false,
+    "is_item_clicked": _false,
+    "is_item_deactivated_after_edit": _false,
+    "is_any_item_active": _false,
+    "is_mouse_clicked": _false,
+    "is_mouse_double_clicked": _false,
+    "is_mouse_released": _false,
+    "is_mouse_down": _false,
+    "is_mouse_dragging": _false,
+    "is_window_hovered": lambda *args, **kwargs: window_hovered,
+    "is_window_focused": _false,
+    "get_mouse_pos": lambda: Vec2(*mouse_pos),
+    "get_cursor_screen_pos": lambda: Vec2(*cursor_screen_pos),
+    "get_window_position": lambda: Vec2(*cursor_screen_pos),
+    "get_window_size": lambda: Vec2(*window_size),
+    "get_content_region_available": lambda: Vec2(*window_size),
+    "get_mouse_drag_delta": lambda *args, **kwargs: Vec2(0.0, 0.0),
+    "calc_text_size": lambda text, *args, **kwargs: Vec2(7.0 * len(text), line_height),
+    "get_text_line_height": lambda: line_height,
+    "get_text_line_height_with_spacing": lambda: line_height,
+    "get_frame_height_with_spacing": lambda: line_height + 4,
+    "get_frame_height": lambda: line_height,
+    "get_cursor_pos_y": lambda: 0.0,
+    "get_window_height": lambda: window_size[1],
+    "get_scroll_y": lambda: scroll_y,
+    "get_window_draw_list": lambda: _draw_list,
+    "get_color_u32_rgba": lambda r, g, b, a: (int(a * 255) << 24) | (int(b * 255) << 16) | (int(g * 255) << 8) | int(r * 255),
+    "get_io": lambda: _io,
+}
+
+
+def _recording(name: str, function):
+    def record(*args, **kwargs):
+        calls[name] += 1
+        return function(*args, **kwargs)
+
+    record.__name__ = name
+    return record
+
+
+@contextlib.contextmanager
+def _colored(*args, **kwargs):
+    calls["colored"] += 1
+    yield
+
+
+def install():
+    """Registers this stub as the `imgui` module."""
+    module = types.ModuleType("imgui")
+
+    def module_getattr(name: str):
+        if name.startswith("__"):
+            raise AttributeError(name)
+
+        if name.isupper():
+            # Flags and enum constants
+            value = 0
+        else:
+            value = _recording(name, _returns.get(name, _none))
+
+        # Cache it, so the lookup cost doesn't end up in the measurements
+        setattr(module, name, value)
+        return value
+
+    module.__getattr__ = module_getattr
+    module.colored = _colored
+    module.Vec2 = Vec2
+    sys.modules["imgui"] = module
+    return module
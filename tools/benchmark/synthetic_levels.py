@@ -0,0 +1,191 @@
+"""
+Builds construct containers shaped like parsed level files, for benchmarking without a RomFS.
+"""
+import math
+import random
+
+from construct import Container, ListContainer
+from mercury_engine_data_structures.formats import Bmscc, Bmsld, Brfld
+from mercury_engine_data_structures.game_check import Game
+
+COMPONENT_TYPES = [
+    ("MODELUPDATER", {"@type": "CModelUpdaterComponent", "sDefaultModelPath": "actors/props/model.bcmdl"}),
+    ("LIFE", {"@type": "CLifeComponent", "bWantsCameraFXPreset": False, "fMaxLife": 100.0,
+              "fCurrentLife": 100.0, "bCurrentLifeLocked": False}),
+    ("COLLISION", {"@type": "CCollisionComponent"}),
+    ("AUDIO", {"@type": "CAudioComponent"}),
+]
+
+SR_COMPONENT_TYPES = ["MODELUPDATER", "TRIGGER", "SPAWNPOINT", "STARTPOINT"]
+
+# Samus Returns levels always have this many actor layers
+SR_LAYER_COUNT = 18
+
+# Half of the width/height of the generated level, in world units
+LEVEL_EXTENT = 20000.0
+
+
+def make_dread_actor(rng: random.Random, name: str, components: int) -> Container:
+    return Container({
+        "@type": "CActor",
+        "sName": name,
+        "oActorDefLink": f"actordef:actors/props/{name.split('_')[0]}/charclasses/{name.split('_')[0]}.bmsad",
+        "vPos": ListContainer([rng.uniform(-LEVEL_EXTENT, LEVEL_EXTENT),
+                               rng.uniform(-LEVEL_EXTENT, LEVEL_EXTENT), 0.0]),
+        "vAng": ListContainer([0.0, 0.0, 0.0]),
+        "pComponents": Container({
+            component_name: Container(component)
+            for component_name, component in COMPONENT_TYPES[:components]
+        }),
+        "bEnabled": True,
+    })
+
+
+def make_brfld(layers: int, actors_per_layer: int, components: int = 2, actor_groups: int = 8,
+               seed: int = 0) -> Brfld:
+    """Each actor is added to one of the `actor_groups` groups."""
+    rng = random.Random(seed)
+    sublayers = Container()
+    groups = Container(
+        (f"eg_collision_camera_{group_index:03d}", ListContainer())
+        for group_index in range(actor_groups)
+    )
+    group_links = list(groups.values())
+
+    for layer_index in range(layers):
+        layer_name = f"layer_{layer_index:03d}"
+        sublayers[layer_name] = Container(
+            sName=layer_name,
+            dctActors=Container({
+                name: make_dread_actor(rng, name, components)
+                for name in (f"actor{actor_index % 50}_{layer_index}_{actor_index:06d}"
+                             for actor_index in range(actors_per_layer))
+            }),
+        )
+        if group_links:
+            for actor_index, actor_name in enumerate(sublayers[layer_name].dctActors.keys()):
+                group_links[actor_index % len(group_links)].append(
+                    f"Root:pScenario:rEntitiesLayer:dctSublayers:{layer_name}:dctActors:{actor_name}"
+                )
+
+    raw = Container(Root=Container({
+        "@type": "CScenario",
+        "pScenario": Container(
+            sLevelID="s010_synthetic",
+            sScenarioID="s010_synthetic",
+            rEntitiesLayer=Container(
+                dctSublayers=sublayers,
+                dctActorGroups=groups,
+            ),
+        ),
+    }))
+    return Brfld(raw, Game.DREAD)
+
+
+def make_sr_actor(rng: random.Random, name: str, components: int) -> Container:
+    return Container(
+        type=name.split("_")[0],
+        position=ListContainer([rng.uniform(-LEVEL_EXTENT, LEVEL_EXTENT),
+                                rng.uniform(-LEVEL_EXTENT, LEVEL_EXTENT), 0.0]),
+        rotation=ListContainer([0.0, 0.0, 0.0]),
+        components=ListContainer(
+            Container(
+                component_type=component_type,
+                command="CreateComponent",
+                arguments=ListContainer([Container(type="s", value="bench")]),
+            )
+            for component_type in SR_COMPONENT_TYPES[:components]
+        ),
+    )
+
+
+def make_bmsld(layers: int, actors_per_layer: int, components: int = 2, actor_groups: int = 8,
+               seed: int = 0) -> Bmsld:
+    """
+    The actors are spread over the first `layers` of the 18 layers. Each actor is added to one of the
+    `actor_groups` sub areas.
+    """
+    if layers > SR_LAYER_COUNT:
+        raise ValueError(f"Samus Returns levels have only {SR_LAYER_COUNT} layers, got {layers}")
+
+    rng = random.Random(seed)
+    actor_layers = ListContainer(Container() for _ in range(SR_LAYER_COUNT))
+    sub_areas = ListContainer(
+        Container(name=f"eg_SubArea_collision_camera_{group_index:03d}", names=ListContainer())
+        for group_index in range(actor_groups)
+    )
+
+    for layer_index in range(layers):
+        for actor_index in range(actors_per_layer):
+            name = f"actor{actor_index % 50}_{layer_index}_{actor_index:06d}"
+            actor_layers[layer_index][name] = make_sr_actor(rng, name, components)
+            if sub_areas:
+                sub_areas[actor_index % len(sub_areas)].names.append(name)
+
+    raw = Container(
+        actors=actor_layers,
+        sub_areas=sub_areas,
+    )
+    return Bmsld(raw, Game.SAMUS_RETURNS)
+
+
+def make_camera(name: str, left: float, bottom: float, right: float, top: float, vertices: int = 4) -> Container:
+    """A rectangular camera, with its outline split into `vertices` points."""
+    corners = [(left, bottom), (right, bottom), (right, top), (left, top)]
+    points = ListContainer()
+    for index in range(max(4, vertices)):
+        # Walk the perimeter at an even pace
+        position = index * 4 / max(4, vertices)
+        side = int(position)
+        fraction = position - side
+        x1, y1 = corners[side]
+        x2, y2 = corners[(side + 1) % 4]
+        points.append(Container(x=x1 + (x2 - x1) * fraction, y=y1 + (y2 - y1) * fraction, material_attribute=0))
+
+    return Container(
+        name=name,
+        type="POLYCOLLECTION2D",
+        data=Container(
+            polys=ListContainer([Container(points=points, boundings=[left, bottom, right, top])]),
+            total_boundings=[left, bottom, right, top],
+        ),
+    )
+
+
+def make_bmscc(cameras: int = 1, vertices: int = 4, target_game: Game = Game.DREAD) -> Bmscc:
+    """The level is tiled with a grid of `cameras` collision cameras, each with `vertices` points."""
+    columns = max(1, math.ceil(math.sqrt(cameras)))
+    rows = max(1, math.ceil(cameras / columns))
+    width = 2 * LEVEL_EXTENT / columns
+    height = 2 * LEVEL_EXTENT / rows
+
+    entries = ListContainer()
+    for index in range(cameras):
+        left = -LEVEL_EXTENT + (index % columns) * width
+        bottom = -LEVEL_EXTENT + (index // columns) * height
+        entries.append(make_camera(f"collision_camera_{index:03d}", left, bottom, left + width, bottom + height,
+                                   vertices))
+
+    raw = Container(layers=ListContainer([Container(name="default", entries=entries)]))
+    return Bmscc(raw, target_game)
+
+
+def display_borders_for(bmscc: Bmscc) -> dict[str, float]:
+    """Same as what `open_file` calculates from the collision cameras."""
+    display_borders: dict[str, float] = {"left": 0, "right": 0, "top": 0, "bottom": 0}
+    for entry in bmscc.raw.layers[0].entries:
+        x1, y1, x2, y2 = entry.data.total_boundings
+        display_borders["left"] = min(display_borders["left"], x1)
+        display_borders["bottom"] = min(display_borders["bottom"], y1)
+        display_borders["right"] = max(display_borders["right"], x2)
+        display_borders["top"] = max(display_borders["top"], y2)
+    return display_borders
+
+
+def make_asset_names(count: int, seed: int = 0) -> list[str]:
+    rng = random.Random(seed)
+    extensions = [".bmsad", ".bcmdl", ".bctex", ".bcskla", ".brfld", ".bmscc", ".brsa", ".bmmap"]
+    return [
+        f"actors/group{rng.randrange(20)}/item{index % 500}/sub{index % 7}/asset_{index:06d}{rng.choice(extensions)}"
+        for index in range(count)
+    ]